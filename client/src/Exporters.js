@@ -10,6 +10,10 @@ import LoadingDialog from "./LoadingDialog";
 const INTERVAL = 3000;
 let refreshInterval = null;
 
+// Neben den Exportern enthält die Antwort den Status des Neuladens
+const exporterIds = exporters =>
+  Object.keys(exporters).filter(exporterId => exporterId !== "reload");
+
 export default class Exporters extends Component {
   constructor(props) {
     super(props);
@@ -27,7 +31,7 @@ export default class Exporters extends Component {
             component="nav"
             subheader={<ListSubheader component="div">Exporter</ListSubheader>}
           >
-            {Object.keys(exporters).map(exporterId => (
+            {exporterIds(exporters).map(exporterId => (
               <Exporter
                 key={exporterId}
                 runExporter={() => this.runExporter(exporterId)}
@@ -71,12 +75,11 @@ export default class Exporters extends Component {
 
   maybeTriggerUpdates() {
     const { exporters } = this.state;
+    const ids = exporterIds(exporters);
     const activeStates = [
-      ...Object.keys(exporters).map(
-        exporterId => exporters[exporterId].scheduled
-      ),
-      ...Object.keys(exporters).map(exporterId => exporters[exporterId].running),
-      ...Object.keys(exporters).map(exporterId => exporters[exporterId].stopping)
+      ...ids.map(exporterId => exporters[exporterId].scheduled),
+      ...ids.map(exporterId => exporters[exporterId].running),
+      ...ids.map(exporterId => exporters[exporterId].stopping)
     ];
     const needsUpdates = activeStates.some(active => active);
     if (needsUpdates && refreshInterval === null) {
@@ -9,10 +9,12 @@ import Dialog from "./Dialog";
 import LoadingDialog from "./LoadingDialog";
 import { get } from "./api";
 
+const RELOAD_INTERVAL = 1000;
+
 export default class extends Component {
   constructor(props) {
     super(props);
-    this.state = { reloading: false, reloaded: null };
+    this.state = { reloading: false, reloaded: null, progress: null };
   }
 
   render() {
@@ -43,15 +45,39 @@ export default class extends Component {
   }
 
   reload() {
-    this.setState({ reloading: true }, () => {
+    this.setState({ reloading: true, progress: null }, () => {
       get("/reload").then(response => {
-        this.setState({ reloading: false, reloaded: response.success });
+        if (response.success) {
+          this.waitForReload();
+        } else {
+          this.setState({ reloading: false, reloaded: false });
+        }
       });
     });
   }
 
+  waitForReload() {
+    // Der Server lädt im Hintergrund neu, der Fortschritt wird über
+    // /exporters abgefragt
+    const reloadInterval = setInterval(() => {
+      get("/exporters").then(exporters => {
+        const { reload } = exporters;
+        if (reload.running) {
+          this.setState({ progress: reload });
+        } else {
+          clearInterval(reloadInterval);
+          this.setState({ reloading: false, reloaded: reload.error === null });
+        }
+      });
+    }, RELOAD_INTERVAL);
+  }
+
   renderLoadingDialog() {
-    return <LoadingDialog text="Server wird aktualisiert..." />;
+    const { progress } = this.state;
+    const text = progress
+      ? `Server wird aktualisiert (${progress.step}/${progress.steps}): ${progress.text}`
+      : "Server wird aktualisiert...";
+    return <LoadingDialog text={text} />;
   }
 
   renderSuccessDialog() {
@@ -0,0 +1,37 @@
+import threading
+from contextlib import contextmanager
+
+# Eingelesene Konfigurationen (Formatierungen, Tooltips, Attribute,
+# Konfigurator, JSON-LD Mapping, GPSR), ein Dictionary pro Name. Beim
+# Neuladen werden neue Caches nur im ladenden Thread aufgebaut und mit
+# swap_caches auf einmal ausgetauscht. Bis dahin sehen alle anderen Threads
+# die bisherigen Konfigurationen.
+current_caches = {}
+thread_state = threading.local()
+
+def get_cache(name):
+    caches = getattr(thread_state, "building_caches", None)
+    if caches == None:
+        caches = current_caches
+    cache = caches.get(name)
+    if cache == None:
+        cache = caches.setdefault(name, {})
+    return cache
+
+@contextmanager
+def building_caches():
+    # Alle Konfigurationen, die im aktuellen Thread eingelesen werden,
+    # landen in neuen Caches
+    caches = {}
+    thread_state.building_caches = caches
+    try:
+        yield caches
+    finally:
+        thread_state.building_caches = None
+
+def swap_caches(caches):
+    global current_caches
+    current_caches = caches
+
+def clear_cache(name):
+    get_cache(name).clear()
@@ -10,6 +10,9 @@ GENERAL_CONFIG_FILE = "config.json"
 FORMATTING_CONFIG_FILE = "Formatierungen.yaml"
 FORMATTING_JSONLD_CONFIG_FILE = "Formatierungen JSON+LD.yaml"
 LOG_DIRECTORY = "logs"
+CACHE_DIRECTORY = "cache"
+HEADER_INDEX_FILE = "complete_header_index.json"
+SNAPSHOT_FILE = "snapshot.pickle"
 
 # Weitere Konstanten und Einstellungen
 
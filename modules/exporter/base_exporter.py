@@ -2,9 +2,35 @@ import csv
 import json
 import os
 import shutil
+import traceback
 from modules.constants import GENERAL_CONFIG_FILE, ARCHIVE_DIRECTORY, \
     CONFIGS_DIRECTORY, DATA_DIRECTORY, TOOLTIP_PATH, EXPORT_DIRECTORY
 
+# Für die wenigen Zeichen ist str.replace schneller als ein gemeinsamer
+# regulärer Ausdruck
+toxic_characters = {
+    "∆": "&#8710;",
+    "✓": "&checkmark;"
+}
+
+def exporter_output_directory(exporter_name):
+    return EXPORT_DIRECTORY + exporter_name + "/"
+
+def exporter_archive_directory(exporter_name):
+    return EXPORT_DIRECTORY + ARCHIVE_DIRECTORY + "/" + exporter_name + "/"
+
+def exporter_last_export_date(exporter_name, running):
+    # Braucht keinen erstellten Exporter, z.B. für die Übersicht im Server
+    last_export_folder = None
+    if running:
+        last_export_folder = exporter_archive_directory(exporter_name)
+    else:
+        last_export_folder = exporter_output_directory(exporter_name)
+    if os.path.exists(last_export_folder):
+        return os.path.getmtime(last_export_folder)
+    else:
+        return None
+
 class BaseExporter:
     def __init__(self, manufacturers):
         with open(GENERAL_CONFIG_FILE, "r", encoding="utf-8") as config_file:
@@ -25,22 +51,35 @@ class BaseExporter:
                 "manufacturers": True,
                 "delivery_status": True
             }
+            # Anzahl Produkte, die write_batch auf einmal bekommt, bei None
+            # alle Produkte eines Herstellers
+            self.batch_size = 1
 
     def name(self):
         raise Exception("BaseExporter::name needs to be implemented by extending classes")
 
+    def preload(self):
+        # Aufwändig zu ladende Daten können von erweiternden Klassen hier
+        # geladen werden, damit der Konstruktor schnell bleibt
+        return None
+
     def output_directory(self):
-        return EXPORT_DIRECTORY + self.name() + "/"
+        return exporter_output_directory(self.name())
 
     def __archive_base_directory(self):
         return EXPORT_DIRECTORY + ARCHIVE_DIRECTORY + "/"
 
     def __archive_directory(self):
-        return self.__archive_base_directory() + self.name() + "/"
+        return exporter_archive_directory(self.name())
 
     def skip_manufacturer(self, manufacturer_name, selected_manufacturers):
         return self.skipping_policy["manufacturers"] and not manufacturer_name in selected_manufacturers
 
+    def prefilter_product(self, product_path):
+        # Erweiternde Klassen können Produkte überspringen, bevor sie
+        # eingelesen werden, dabei dürfen keine Fehler verloren gehen
+        return False
+
     def skip_product(self, fields):
         if not self.skipping_policy["delivery_status"]:
             return False, None
@@ -53,15 +92,7 @@ class BaseExporter:
         return not delivery_status in active_delivery_statuses, None
 
     def last_export_date(self, running):
-        last_export_folder = None
-        if running:
-            last_export_folder = self.__archive_directory()
-        else:
-            last_export_folder = self.output_directory()
-        if os.path.exists(last_export_folder):
-            return os.path.getmtime(last_export_folder)
-        else:
-            return None
+        return exporter_last_export_date(self.name(), running)
 
     def setup(self):
         # Wenn es bereits einen Export gibt, wird dieser archiviert, sonst
@@ -91,27 +122,50 @@ class BaseExporter:
                                      escapechar=self.csv_escape_char, quoting=csv.QUOTE_NONE))
 
     def write_csv_row(self, path, row, file_mode="a"):
+        return self.write_csv_rows(path, [row], file_mode)[0]
+
+    def write_csv_rows(self, path, rows, file_mode="a"):
+        # Schreibt mehrere Zeilen mit einmal geöffneter Datei und gibt für
+        # jede Zeile den Fehlercode zurück
+        error_codes = []
         with self.open_file(path, file_mode) as file:
             csv_writer = self.get_csv_handler(file, csv.writer)
-
-            # Remove knwon characters that cause UnicodeEncodeError
-            toxic_characters = {
-                "∆": "&#8710;",
-                "✓": "&checkmark;"
-            }
-            clean_row = []
-            for field in row:
-                clean_field = field
-                if clean_field != None:
-                    for toxic_character, html_escape_code in toxic_characters.items():
-                        clean_field = clean_field.replace(toxic_character, html_escape_code)
-                clean_row.append(clean_field)
-
+            for row in rows:
+                # Remove knwon characters that cause UnicodeEncodeError
+                clean_row = []
+                for field in row:
+                    clean_field = field
+                    if clean_field != None:
+                        for toxic_character, html_escape_code in toxic_characters.items():
+                            clean_field = clean_field.replace(toxic_character, html_escape_code)
+                    clean_row.append(clean_field)
+
+                try:
+                    csv_writer.writerow(clean_row)
+                    error_codes.append(None)
+                except UnicodeEncodeError as error:
+                    error_codes.append("FEHLER BEIM SCHREIBEN ({})".format(error))
+        return error_codes
+
+    def render(self, parameters):
+        # Gibt Header, Zeile und Fehlercode für ein Produkt zurück, ohne etwas
+        # zu schreiben (z.B. für die Vorschau)
+        raise Exception("BaseExporter::render needs to be implemented by extending classes")
+
+    def write_batch(self, products, manufacturer_context):
+        # Schreibt mehrere Produkte eines Herstellers und gibt für jedes
+        # Produkt den Fehlercode zurück. manufacturer_context enthält Name und
+        # Informationen des Herstellers. Erweiternde Klassen können die
+        # Produkte gemeinsam verarbeiten, sonst wird jedes Produkt einzeln
+        # mit write_to_csv geschrieben.
+        error_codes = []
+        for parameters in products:
             try:
-                csv_writer.writerow(clean_row)
-                return None
-            except UnicodeEncodeError as error:
-                return "FEHLER BEIM SCHREIBEN ({})".format(error)
+                error_codes.append(self.write_to_csv(parameters))
+            except Exception as exception:
+                print(traceback.format_exc(), flush=True)
+                error_codes.append(str(exception))
+        return error_codes
 
     def write_to_csv(self, **args):
         raise Exception("BaseExporter::write_to_csv needs to be implemented by extending classes")
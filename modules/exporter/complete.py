@@ -1,11 +1,11 @@
-import os
 import json
-from modules.parser.prod import parse_product
-from modules.parser.attributes import parse_attributes
+from modules.parser.attributes import load_attributes
 from modules.parser.download import parse_download
 from modules.constants import COMPLETE_NAME, TECHDATA
-from modules.logger import Logger
+from modules.logger import Logger, WARN
 from modules.exporter.utils.unescape_bsvp import unescape_bsvp_to_html
+from modules.header_index import update_header_index
+from modules.exporter.utils.sparse_row import get_field_indices, sparse_row
 
 def treat_special_cases(field_name, field_value):
     # DOWNLOAD.X -- soll vernünftig geparsed werden
@@ -21,25 +21,20 @@ def get_complete_header_fields(manufacturers, export_config = { "exclude": [] })
     general_fields = set()
     techdata_fields = set()
 
-    for manufacturer_name, manufacturer in manufacturers.items():
-        for product_name, product_path in manufacturer["products"].items():
-            if os.path.exists(product_path):
-                fields, attribute_names, attribute_types, error_code = parse_product(product_path)
-                if error_code != None:
-                    continue
-                for field_name, field_value in fields.items():
-                    if not field_name in export_config["exclude"]:
-                        if field_name != TECHDATA:
-                            general_fields.add(field_name)
-                        else:
-                            for field_id in field_value.keys():
-                                if not field_id in export_config["exclude"]:
-                                    techdata_fields.add(field_id)
-
-    return sorted(general_fields), sorted(techdata_fields)
+    for product in update_header_index(manufacturers).values():
+        general_fields.update(product["general"])
+        techdata_fields.update(product["techdata"])
+
+    excluded_fields = set(export_config["exclude"])
+    general_fields.discard(TECHDATA)
+    if TECHDATA in excluded_fields:
+        techdata_fields = set()
+
+    return sorted(general_fields - excluded_fields), sorted(techdata_fields - excluded_fields)
 
 from .base_exporter import BaseExporter
 from collections import OrderedDict
+import threading
 
 class CompleteExporter(BaseExporter):
     def __init__(self, manufacturers):
@@ -47,12 +42,28 @@ class CompleteExporter(BaseExporter):
         self.csv_separator = self.shop_csv_separator
         export_config_path = self.configs_base_directory + self.name() + ".json"
         with open(export_config_path, "r", encoding="utf-8") as export_config_file:
-            export_config = json.load(export_config_file)
-            self.general_fields, self.techdata_fields = get_complete_header_fields(manufacturers, export_config)
+            self.export_config = json.load(export_config_file)
+
+        # Die Header Felder werden erst bei Bedarf aus allen Produkten gelesen
+        self.general_fields = None
+        self.techdata_fields = None
+        self.general_field_indices = None
+        self.techdata_field_indices = None
+        self.header_fields_lock = threading.Lock()
 
         # Konfiguration des Exporters
         self.skipping_policy["delivery_status"] = False
 
+    def preload(self):
+        with self.header_fields_lock:
+            if self.general_fields == None:
+                self.general_fields, self.techdata_fields = get_complete_header_fields(
+                    self.manufacturers,
+                    self.export_config
+                )
+                self.general_field_indices = get_field_indices(self.general_fields)
+                self.techdata_field_indices = get_field_indices(self.techdata_fields)
+
     def __header_fields(self):
         return self.general_fields + self.techdata_fields
 
@@ -60,44 +71,48 @@ class CompleteExporter(BaseExporter):
         return COMPLETE_NAME
 
     def setup(self):
+        self.preload()
         super().setup()
 
-        # Sanity checks
-        attribute_mapping = parse_attributes()
+        # Sanity checks, werden als Warnungen auch bei leiseren Logs
+        # geschrieben
+        attribute_mapping = load_attributes()
         logger = Logger()
 
-        logger.log("")
-        logger.log("Starte Plausibilitätsprüfung der technischen Datenfelder...")
-        logger.log("")
+        logger.log("", level=WARN)
+        logger.log("Starte Plausibilitätsprüfung der technischen Datenfelder...", level=WARN)
+        logger.log("", level=WARN)
 
-        logger.log("Felder ohne Namen in MasterRecordMask:")
-        logger.log("")
+        logger.log("Felder ohne Namen in MasterRecordMask:", level=WARN)
+        logger.log("", level=WARN)
         for techdata_field in self.techdata_fields:
             if techdata_field not in attribute_mapping:
-                logger.log(techdata_field)
+                logger.log(techdata_field, level=WARN)
 
-        logger.log("")
-        logger.log("Felder die nicht in Produkten genutzt werden:")
-        logger.log("")
+        logger.log("", level=WARN)
+        logger.log("Felder die nicht in Produkten genutzt werden:", level=WARN)
+        logger.log("", level=WARN)
         for techdata_field, attribute_name in attribute_mapping.items():
             if techdata_field not in self.techdata_fields:
-                logger.log("{} ({})".format(attribute_name, techdata_field))
+                logger.log("{} ({})", attribute_name, techdata_field, level=WARN)
 
-        logger.log("")
-        logger.log("Plausibilitätsprüfung der technischen Datenfelder beendet.")
-        logger.log("")
+        logger.log("", level=WARN)
+        logger.log("Plausibilitätsprüfung der technischen Datenfelder beendet.", level=WARN)
+        logger.log("", level=WARN)
 
-    def write_to_csv(self, parameters):
+    def render(self, parameters):
         prod_fields = parameters["fields"]
+        get_value = lambda field, value: finalize(field, value) or None
+        csv_row = sparse_row(prod_fields, self.general_field_indices, get_value)
+        if TECHDATA in prod_fields:
+            csv_row += sparse_row(prod_fields[TECHDATA], self.techdata_field_indices, get_value)
+        else:
+            csv_row += [None] * len(self.techdata_fields)
+        return self.__header_fields(), csv_row, None
+
+    def write_to_csv(self, parameters):
         manufacturer_name = parameters["manufacturer_name"]
         csv_path = self.output_directory() + manufacturer_name + ".csv"
-        self.maybe_create_csv(csv_path, self.__header_fields())
-        csv_row = list(map(
-            lambda field: field in prod_fields and finalize(field, prod_fields[field]) or None,
-            self.general_fields
-        ))
-        csv_row += list(map(
-            lambda field: TECHDATA in prod_fields and field in prod_fields[TECHDATA] and finalize(field, prod_fields[TECHDATA][field]) or None,
-            self.techdata_fields
-        ))
+        header_fields, csv_row, error_code = self.render(parameters)
+        self.maybe_create_csv(csv_path, header_fields)
         return self.write_csv_row(csv_path, csv_row)
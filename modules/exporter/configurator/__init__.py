@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
+import traceback
 from ..base_exporter import BaseExporter
 from .configs import transform_configs
-from modules.formatter import format_field
+from modules.formatter import format_field, format_column
+from modules.logger import Logger
+from collections import OrderedDict
 from modules.constants import CONFIGURATOR_NAME, PRODUCT_TYPE_ID, TECHDATA
-from modules.exporter.utils.flatten_fields import flatten_fields
+from modules.exporter.utils.field_view import FieldView
+from modules.parser.prod import scan_product
 
 class ConfiguratorExporter(BaseExporter):
     def __init__(self, manufacturers):
@@ -14,6 +18,11 @@ class ConfiguratorExporter(BaseExporter):
 
         # Konfiguration des Exporters
         self.skipping_policy["manufacturers"] = False
+        # Bei spaltenweiser Formatierung werden alle Produkte eines
+        # Herstellers gemeinsam geschrieben
+        self.columnar_formatting = self.config.get("konfigurator-spaltenweise-formatierung", False)
+        if self.columnar_formatting:
+            self.batch_size = None
 
     def name(self):
         return CONFIGURATOR_NAME
@@ -39,34 +48,168 @@ class ConfiguratorExporter(BaseExporter):
         header_fields += list(config["kombinationen"].keys())
         return header_fields
 
+    def render(self, parameters):
+        # Ohne Zeile, wenn es keine Konfiguration für den Produkttyp gibt
+        fields = parameters["fields"]
+        error_code = self.validate_fields(fields)
+        if error_code != None:
+            return None, None, error_code
+
+        fields = FieldView(fields)
+        product_type = fields[PRODUCT_TYPE_ID]
+        if not product_type in self.export_configs:
+            return None, None, None
+        config = self.export_configs[product_type]
+        return self.header_fields(config), self.extract_product_information(config, fields), None
+
+    def prefilter_product(self, product_path):
+        # Produkte, deren Produkttyp keine Konfiguration hat, werden nicht
+        # eingelesen. Kann der Produkttyp nicht sicher bestimmt werden oder
+        # würde beim Einlesen ein Fehler gemeldet, wird normal eingelesen.
+        scan = scan_product(product_path)
+        if scan == None:
+            return False
+        if self.skipping_policy["delivery_status"] and not "DELSTAT" in scan["field_names"]:
+            return False
+        # Ohne MANUFACTURER meldet write_to_csv einen Fehler, auch wenn der
+        # Produkttyp keine Konfiguration hat
+        if not "MANUFACTURER" in scan["field_names"]:
+            return False
+        return not scan["product_type"] in self.export_configs
+
+    def output_paths(self, config, manufacturer):
+        return config["manufacturer_output_paths"].get(manufacturer, config["base_output_paths"])
+
+    def write_rows(self, config, manufacturer, product_information):
+        # Die Zeile wird einmal erstellt und in alle passenden Dateien
+        # geschrieben
+        error_code = None
+        for output_path in self.output_paths(config, manufacturer):
+            error_code = self.write_csv_row(output_path, product_information)
+        return error_code
+
     def write_to_csv(self, parameters):
         fields = parameters["fields"]
         error_code = self.validate_fields(fields)
         if error_code != None:
             return error_code
 
-        fields = flatten_fields(fields)
+        fields = FieldView(fields)
         manufacturer = fields["MANUFACTURER"]
         product_type = fields[PRODUCT_TYPE_ID]
         if product_type in self.export_configs:
             config = self.export_configs[product_type]
-            error_code = None
-            for output in config["outputs"]:
-                if output["base"] or output["manufacturer"] == manufacturer:
-                    product_information = self.extract_product_information(config, fields)
-                    error_code = self.write_csv_row(output["path"], product_information)
-            return error_code
+            product_information = self.extract_product_information(config, fields)
+            return self.write_rows(config, manufacturer, product_information)
+
+    def write_batch(self, products, manufacturer_context):
+        # Schreibt alle Produkte eines Herstellers spaltenweise: die Felder
+        # werden pro Produkttyp gesammelt und jeder unterschiedliche Wert
+        # nur einmal formatiert. Die Zeilen werden danach pro Datei gemeinsam
+        # geschrieben.
+        if not self.columnar_formatting:
+            return super().write_batch(products, manufacturer_context)
+
+        error_codes = [None] * len(products)
+        product_type_products = OrderedDict()
+        for index, parameters in enumerate(products):
+            fields = parameters["fields"]
+            error_code = self.validate_fields(fields)
+            if error_code != None:
+                error_codes[index] = error_code
+                continue
+            fields = FieldView(fields)
+            if not "MANUFACTURER" in fields:
+                # Wie in write_to_csv, auch für Produkttypen ohne
+                # Konfiguration
+                error_codes[index] = str(KeyError("MANUFACTURER"))
+                continue
+            product_type = fields[PRODUCT_TYPE_ID]
+            if product_type in self.export_configs:
+                product_type_products.setdefault(product_type, []).append((index, fields))
+
+        # Wie bei write_rows gilt der Fehlercode der letzten Datei
+        output_rows = OrderedDict()
+        last_output_paths = {}
+        logger = Logger()
+        for product_type, indexed_fields in product_type_products.items():
+            config = self.export_configs[product_type]
+            try:
+                # Die Logs der Formatierung werden erst mit den Zeilen
+                # geschrieben, bei einem Fehler werden sie verworfen
+                with logger.captured():
+                    columns = self.format_columns(config, [fields for index, fields in indexed_fields])
+            except Exception:
+                print(traceback.format_exc(), flush=True)
+                # Die Produkte einzeln formatieren, damit nur fehlerhafte
+                # Produkte ausfallen
+                columns = None
+            for row, (index, fields) in enumerate(indexed_fields):
+                get_field = None
+                if columns != None:
+                    get_field = self.column_field_getter(columns, row)
+                try:
+                    manufacturer = fields["MANUFACTURER"]
+                    product_information = self.extract_product_information(config, fields, get_field)
+                except Exception as exception:
+                    print(traceback.format_exc(), flush=True)
+                    error_codes[index] = str(exception)
+                    continue
+                for output_path in self.output_paths(config, manufacturer):
+                    output_rows.setdefault(output_path, []).append((index, product_information))
+                    last_output_paths[index] = output_path
+
+        for output_path, indexed_rows in output_rows.items():
+            try:
+                path_error_codes = self.write_csv_rows(output_path, [row for index, row in indexed_rows])
+            except Exception as exception:
+                print(traceback.format_exc(), flush=True)
+                path_error_codes = [str(exception)] * len(indexed_rows)
+            for (index, row), error_code in zip(indexed_rows, path_error_codes):
+                if last_output_paths[index] == output_path:
+                    error_codes[index] = error_code
+        return error_codes
+
+    def format_columns(self, config, products_fields):
+        field_names = list(config["felder"].keys())
+        for combination in config["kombinationen"].values():
+            field_names += combination["felder"]
+
+        columns = {}
+        for field_name in field_names:
+            if field_name in columns:
+                continue
+            values = [fields.get(field_name) for fields in products_fields]
+            rows = [row for row, value in enumerate(values) if value != None]
+            values = [values[row] for row in rows]
+            columns[field_name] = dict(zip(rows, format_column(values, field_name)))
+        return columns
+
+    def column_field_getter(self, columns, row):
+        # Wie get_field, aber mit den bereits formatierten Werten. Die Logs
+        # der Formatierung werden bei jeder Verwendung geschrieben.
+        logger = Logger()
+        def get_field(config, fields, field_name):
+            entry = columns[field_name].get(row)
+            if entry == None:
+                return None
+            value, log_lines = entry
+            logger.replay(log_lines)
+            return value
+        return get_field
 
-    def export_fields(self, config, fields):
+    def export_fields(self, config, fields, get_field=None):
+        get_field = get_field or self.get_field
         product_information = []
         # Spezifizierte Felder in product_information schreiben
         for field_name, field_value in config["felder"].items():
-            product_information.append(self.get_field(config, fields, field_name))
+            product_information.append(get_field(config, fields, field_name))
         return product_information
 
-    def export_kombination(self, config, fields, combination):
+    def export_kombination(self, config, fields, combination, get_field=None):
+        get_field = get_field or self.get_field
         combination_fields = list(map(
-            lambda field_name: self.get_field(config, fields, field_name) or "",
+            lambda field_name: get_field(config, fields, field_name) or "",
             combination["felder"]
         ))
         if all(field == "" for field in combination_fields):
@@ -74,20 +217,20 @@ class ConfiguratorExporter(BaseExporter):
         else:
             return combination["separator"].join(combination_fields)
 
-    def export_kombinations(self, config, fields):
+    def export_kombinations(self, config, fields, get_field=None):
         product_information = []
         # Spezifizierte Kominationen bilden und in product_information schreiben
         for name, combination in config["kombinationen"].items():
-            product_information.append(self.export_kombination(config, fields, combination))
+            product_information.append(self.export_kombination(config, fields, combination, get_field))
         return product_information
 
     def combine_product_information(self, information, other_information):
         return information + other_information
 
-    def extract_product_information(self, config, fields):
+    def extract_product_information(self, config, fields, get_field=None):
         product_information = self.combine_product_information(
-            self.export_fields(config, fields),
-            self.export_kombinations(config, fields)
+            self.export_fields(config, fields, get_field),
+            self.export_kombinations(config, fields, get_field)
         )
         return product_information
 
@@ -101,7 +244,8 @@ class ConfiguratorExporter(BaseExporter):
         return None
 
     def get_field(self, config, fields, field_name):
-        if field_name in fields:
-            return format_field(fields[field_name], field_name)
+        value = fields.get(field_name)
+        if value != None:
+            return format_field(value, field_name)
         else:
             return None
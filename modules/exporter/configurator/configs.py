@@ -1,42 +1,77 @@
-import os, json
+import os, json, copy
 from collections import OrderedDict
+from modules.config_caches import get_cache, clear_cache
+from modules.source_signatures import record_sources
+
+# Eingelesene Konfigurationen pro Ordner, bis sie neu geladen werden
+def loaded_configs():
+    return get_cache("configurator")
+
+def load_configs(configs_directory):
+    directory_configs = loaded_configs()
+    if not configs_directory in directory_configs:
+        configs = OrderedDict()
+        # Mit dem Ordner, damit auch gelöschte Konfigurationen erkannt werden
+        record_sources([configs_directory])
+        for export_config_name in os.listdir(configs_directory):
+            if export_config_name.endswith(".json"):
+                export_config_path = configs_directory + export_config_name
+                record_sources([export_config_path])
+                with open(export_config_path, "r",  encoding="utf-8") as export_config_file:
+                    configs[export_config_name] = json.load(export_config_file, object_pairs_hook=OrderedDict)
+        directory_configs[configs_directory] = configs
+    return directory_configs[configs_directory]
+
+def reload_configs():
+    clear_cache("configurator")
 
 def transform_configs(configs_directory, output_directory):
     # Schreibe Konfigurationen so um, dass sie über den Produkttyp als Key
     # erreichbar sind.
     configs = OrderedDict()
 
-    for export_config_name in os.listdir(configs_directory):
-        if export_config_name.endswith(".json"):
-            export_config_path = configs_directory + export_config_name
-            with open(export_config_path, "r",  encoding="utf-8") as export_config_file:
-                export_config = json.load(export_config_file, object_pairs_hook=OrderedDict)
-
-            config_name = output_directory + export_config_name.split(".json")[0]
-            base_output_path = config_name + ".csv"
-
-            # Schreibe einen Output für die allgemeine Konfigurator CSV-Datei für
-            # den aktuellen Produkttyp und einen pro definiertem Hersteller
-            export_config["outputs"] = [{ "base": True, "path": base_output_path }]
-            if "hersteller_export" in export_config:
-                for manufacturer in export_config["hersteller_export"]:
-                    manufacturer_output_path = "{}_{}.csv".format(
-                        config_name,
-                        manufacturer
-                    )
-                    export_config["outputs"].append({
-                        "base": False,
-                        "manufacturer": manufacturer,
-                        "path": manufacturer_output_path
-                    })
-
-            # Im Exporter werden Kombinationen nicht noch
-            # einmal geprüft, wenn es keine gibt, wird einfach ein leeres
-            # Objekt eingesetzt, über das dann iteriert werden kann.
-            if not "kombinationen" in export_config:
-                export_config["kombinationen"] = {}
-
-            product_type = export_config["produkttyp"]
-            configs[product_type] = export_config
+    for export_config_name, loaded_config in load_configs(configs_directory).items():
+        # Die eingelesene Konfiguration bleibt unverändert
+        export_config = copy.deepcopy(loaded_config)
+
+        config_name = output_directory + export_config_name.split(".json")[0]
+        base_output_path = config_name + ".csv"
+
+        # Schreibe einen Output für die allgemeine Konfigurator CSV-Datei für
+        # den aktuellen Produkttyp und einen pro definiertem Hersteller
+        export_config["outputs"] = [{ "base": True, "path": base_output_path }]
+        if "hersteller_export" in export_config:
+            for manufacturer in export_config["hersteller_export"]:
+                manufacturer_output_path = "{}_{}.csv".format(
+                    config_name,
+                    manufacturer
+                )
+                export_config["outputs"].append({
+                    "base": False,
+                    "manufacturer": manufacturer,
+                    "path": manufacturer_output_path
+                })
+
+        # Pfade, in die ein Produkt je nach Hersteller geschrieben wird, die
+        # allgemeine CSV-Datei gilt für alle Hersteller
+        export_config["base_output_paths"] = [
+            output["path"] for output in export_config["outputs"] if output["base"]
+        ]
+        export_config["manufacturer_output_paths"] = {}
+        for output in export_config["outputs"]:
+            if not output["base"]:
+                export_config["manufacturer_output_paths"].setdefault(
+                    output["manufacturer"],
+                    list(export_config["base_output_paths"])
+                ).append(output["path"])
+
+        # Im Exporter werden Kombinationen nicht noch
+        # einmal geprüft, wenn es keine gibt, wird einfach ein leeres
+        # Objekt eingesetzt, über das dann iteriert werden kann.
+        if not "kombinationen" in export_config:
+            export_config["kombinationen"] = {}
+
+        product_type = export_config["produkttyp"]
+        configs[product_type] = export_config
 
     return configs
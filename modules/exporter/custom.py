@@ -2,7 +2,8 @@ import json
 from .base_exporter import BaseExporter
 from collections import OrderedDict
 from modules.constants import CUSTOM_NAME
-from modules.exporter.utils.flatten_fields import flatten_fields
+from modules.exporter.utils.field_view import FieldView
+from modules.parser.prod import scan_fields
 
 class CustomExporter(BaseExporter):
     def __init__(self, manufacturers):
@@ -12,29 +13,61 @@ class CustomExporter(BaseExporter):
         with open(export_config_path, "r", encoding="utf-8") as export_config_file:
             self.export_config = json.load(export_config_file, object_pairs_hook=OrderedDict)
 
+        # Header, Felder und Filter werden einmal aus der Konfiguration
+        # gelesen
+        self.header_fields = list(self.export_config.keys())
+        self.included_fields = []
+        self.filters = []
+        for field_name, field_value in self.export_config.items():
+            if isinstance(field_value, str):
+                self.included_fields.append(field_value)
+            else:
+                self.included_fields.append(field_value["field"])
+                self.filters.append((field_value["field"], field_value["contains"]))
+        self.filter_fields = set(field for field, contains in self.filters)
+
     def name(self):
         return CUSTOM_NAME
 
+    def csv_path(self):
+        return self.output_directory() + self.name() + ".csv"
+
+    def setup(self):
+        super().setup()
+        self.write_csv_row(self.csv_path(), self.header_fields, file_mode="w")
+
+    def matches_filters(self, prod_fields):
+        for field, contains in self.filters:
+            value = prod_fields.get(field)
+            if value == None or not contains in value:
+                return False
+        return True
+
+    def prefilter_product(self, product_path):
+        # Mit Filtern werden nur die gefilterten Felder aus der Datei gelesen,
+        # Produkte die nicht passen werden nicht eingelesen. Produkte ohne
+        # DELSTAT werden eingelesen, damit der Fehler gemeldet wird.
+        if not self.filters:
+            return False
+        scan = scan_fields(product_path, self.filter_fields)
+        if scan == None:
+            return False
+        if self.skipping_policy["delivery_status"] and not "DELSTAT" in scan["field_names"]:
+            return False
+        return not self.matches_filters(scan["values"])
+
+    def render(self, parameters):
+        # Ohne Zeile, wenn das Produkt nicht den Filtern entspricht
+        prod_fields = FieldView(parameters["fields"])
+        if not self.matches_filters(prod_fields):
+            return self.header_fields, None, None
+        csv_row = list(map(
+            lambda field: prod_fields.get(field),
+            self.included_fields
+        ))
+        return self.header_fields, csv_row, None
+
     def write_to_csv(self, parameters):
-        prod_fields = flatten_fields(parameters["fields"])
-        manufacturer_name = parameters["manufacturer_name"]
-        csv_path = self.output_directory() + self.name() + ".csv"
-        header_fields = list(self.export_config.keys())
-        self.maybe_create_csv(csv_path, header_fields)
-        include_product = True
-        included_fields = []
-        for field_name, field_value in self.export_config.items():
-            if isinstance(field_value, str):
-                included_fields.append(field_value)
-                continue
-            else:
-                field = field_value["field"]
-                included_fields.append(field)
-                value = prod_fields[field] if field in prod_fields else None
-                include_product = include_product and value != None and field_value["contains"] in value
-        if include_product:
-            csv_row = list(map(
-                lambda field: prod_fields[field] if field in prod_fields else None,
-                included_fields
-            ))
-            return self.write_csv_row(csv_path, csv_row)
+        header_fields, csv_row, error_code = self.render(parameters)
+        if csv_row != None:
+            return self.write_csv_row(self.csv_path(), csv_row)
@@ -4,6 +4,7 @@ from modules.exporter.shop import ShopExporter, special_cases, export_descriptio
 from modules.exporter.shop.gm_price_status import export_gm_price_status
 from modules.constants import GAMBIO_NAME, SHOP_NAME, TECHDATA
 from modules.formatter import format_field
+from modules.exporter.utils.sparse_row import get_field_indices, sparse_row
 
 category_prefix = "p_cat"
 category_postfix = ".de"
@@ -29,6 +30,7 @@ class GambioExporter(ShopExporter):
         gambio_config = self.configs_base_directory + self.name() + ".json"
         with open(gambio_config, "r", encoding="utf-8") as gambio_config_file:
             self.techdata_fields = json.load(gambio_config_file, object_pairs_hook=OrderedDict)
+        self.techdata_field_indices = get_field_indices(self.techdata_fields.keys())
 
         # Combine Shop special_cases with Gambio special_cases
         self.combined_special_cases = {**special_cases, **gambio_special_cases}
@@ -39,8 +41,9 @@ class GambioExporter(ShopExporter):
     def name(self):
         return GAMBIO_NAME
 
-    def header_fields(self, prod_fields, ilugg_fields):
-        shop_header_fields = super().header_fields(prod_fields, ilugg_fields)
+    def build_column_plan(self, iteration_maximums):
+        plan = super().build_column_plan(iteration_maximums)
+        shop_header_fields = plan.header_fields
         header_fields = []
         for header_field in shop_header_fields:
             if header_field == "p_cat.0":
@@ -51,57 +54,58 @@ class GambioExporter(ShopExporter):
                 header_fields.append(header_field)
 
         # Add Gambio-specific fields only if they don't already exist
+        plan.gambio_special_cases = []
         for field_name in gambio_special_cases.keys():
             if field_name not in header_fields:
                 header_fields.append(field_name)
-        
+            if field_name not in shop_header_fields:
+                plan.gambio_special_cases.append(field_name)
+
         header_fields = header_fields + list(self.techdata_fields.values())
-        return header_fields
+        plan.header_fields = header_fields
 
-    def extract_information(self, prod_fields, ilugg_fields, attribute_names, attribute_types):
-        row = super().extract_information(prod_fields, ilugg_fields, attribute_names, attribute_types)
-        # Fasse Werte von p_cat.x in p_cat.0 zusammen
-        # Lasse die übrigen p_cat Felder leer
-        header_fields = self.header_fields(prod_fields, ilugg_fields)
-        main_category_index = None
-        other_category_indices = []
-        category_values = []
-        current_field_index = 0
-        for header_field in header_fields:
+        # Positionen der p_cat Felder, die in p_cat.0 zusammengefasst werden
+        plan.main_category_index = None
+        plan.other_category_indices = []
+        plan.category_indices = []
+        for current_field_index, header_field in enumerate(header_fields):
             if header_field.startswith(category_prefix):
-                category_value = row[current_field_index]
-                if category_value != "":
-                    category_values.append(category_value)
+                plan.category_indices.append(current_field_index)
                 if header_field == main_category:
-                    main_category_index = current_field_index
+                    plan.main_category_index = current_field_index
                 else:
-                    other_category_indices.append(current_field_index)
-            current_field_index = current_field_index + 1
-        row[main_category_index] = " > ".join(category_values)
-        for other_category_index in other_category_indices:
+                    plan.other_category_indices.append(current_field_index)
+        return plan
+
+    def extract_information(self, plan, prod_fields, ilugg_fields, attribute_names, attribute_types):
+        # Die Sonderfälle von Shop und Gambio teilen sich die Zwischenergebnisse
+        parameters = self.special_case_parameters(prod_fields, ilugg_fields, attribute_names, attribute_types)
+        row = self.extract_columns(plan, prod_fields, ilugg_fields, parameters)
+        # Fasse Werte von p_cat.x in p_cat.0 zusammen
+        # Lasse die übrigen p_cat Felder leer
+        category_values = []
+        for category_index in plan.category_indices:
+            category_value = row[category_index]
+            if category_value != "":
+                category_values.append(category_value)
+        row[plan.main_category_index] = " > ".join(category_values)
+        for other_category_index in plan.other_category_indices:
             row[other_category_index] = None
 
         # Add Gambio-specific fields only if they were added to the header
-        shop_header_fields = super().header_fields(prod_fields, ilugg_fields)
-        for field_name in gambio_special_cases.keys():
-            if field_name not in shop_header_fields:
-                parameters = {
-                    "prod_fields": prod_fields,
-                    "ilugg_fields": ilugg_fields,
-                    "attribute_names": attribute_names,
-                    "attribute_types": attribute_types,
-                    "tooltips": self.tooltips,
-                    "specification": {}
-                }
-                value = gambio_special_cases[field_name](parameters)
-                row.append(value)
+        for field_name in plan.gambio_special_cases:
+            special_case_parameters = dict(parameters)
+            special_case_parameters["specification"] = {}
+            value = gambio_special_cases[field_name](special_case_parameters)
+            row.append(value)
 
         # Füge TECHDATA Felder hinter Shop Feldern an
-        for techdata_field in self.techdata_fields.keys():
-            value = None
-            if TECHDATA in prod_fields:
-                techdata = prod_fields[TECHDATA]
-                if techdata_field in techdata:
-                    value = format_field(techdata[techdata_field], techdata_field)
-            row.append(value)
+        if TECHDATA in prod_fields:
+            row += sparse_row(
+                prod_fields[TECHDATA],
+                self.techdata_field_indices,
+                lambda field, value: format_field(value, field)
+            )
+        else:
+            row += [None] * len(self.techdata_field_indices)
         return row
@@ -15,14 +15,18 @@ class PriceExporter(BaseExporter):
     def name(self):
         return PRICE_NAME
 
-    def write_to_csv(self, parameters):
+    def render(self, parameters):
         prod_fields = parameters["fields"]
-        manufacturer_name = parameters["manufacturer_name"]
-        csv_path = self.output_directory() + manufacturer_name + ".csv"
         header_fields = list(self.export_config.keys())
-        self.maybe_create_csv(csv_path, header_fields)
         csv_row = list(map(
             lambda field: prod_fields[field],
             list(self.export_config.values())
         ))
+        return header_fields, csv_row, None
+
+    def write_to_csv(self, parameters):
+        manufacturer_name = parameters["manufacturer_name"]
+        csv_path = self.output_directory() + manufacturer_name + ".csv"
+        header_fields, csv_row, error_code = self.render(parameters)
+        self.maybe_create_csv(csv_path, header_fields)
         return self.write_csv_row(csv_path, csv_row)
@@ -2,7 +2,7 @@
 from modules.constants import MANUFACTURER_ENDING, SHOP_NAME
 from ..base_exporter import BaseExporter
 import json
-from modules.parser.tooltips import parse_tooltips
+from modules.parser.tooltips import load_tooltips
 from .description import export_description
 from .energy_efficiency_text import export_energy_efficiency_text
 from .video import export_video
@@ -30,11 +30,54 @@ def escape(value):
         return None
     return unescape_bsvp_to_html(value)
 
+def get_prod_value(prod_fields, prod_field):
+    value = None
+    if prod_field in prod_fields:
+        value = prod_fields[prod_field]
+        # Wenn das Feld ein Preisfeld ist, den Separator entfernen, damit der Shop das Komma
+        # nicht beim Separator setzt
+        if "PRICE" in prod_field and "," in value:
+            value = value.replace(".", "")
+            value = value.replace(",", ".")
+    return value
+
+def value_column(specification):
+    # Spalte, deren Wert wie in __get_value aus der Spezifikation gelesen wird
+    if "wert" in specification:
+        value = specification["wert"]
+        return lambda prod_fields, ilugg_fields, parameters: value
+    elif "prod" in specification:
+        prod_field = specification["prod"]
+        return lambda prod_fields, ilugg_fields, parameters: get_prod_value(prod_fields, prod_field)
+    elif "ilugg" in specification:
+        ilugg_field = specification["ilugg"]
+        return lambda prod_fields, ilugg_fields, parameters: \
+            ilugg_fields[ilugg_field] if ilugg_field in ilugg_fields else None
+    return lambda prod_fields, ilugg_fields, parameters: None
+
+def iterable_column(field_name):
+    return lambda prod_fields, ilugg_fields, parameters: \
+        prod_fields[field_name] if field_name in prod_fields else None
+
+def special_case_column(special_case, specification):
+    def column(prod_fields, ilugg_fields, parameters):
+        special_case_parameters = dict(parameters)
+        special_case_parameters["specification"] = specification
+        return special_case(special_case_parameters)
+    return column
+
+class ColumnPlan():
+    # Header und Spalten für eine Anzahl iterierbarer Felder. Jede Spalte
+    # ist eine Funktion, die den Wert aus Produkt und ILUGG liest.
+    def __init__(self, header_fields, columns):
+        self.header_fields = header_fields
+        self.columns = columns
+
 class ShopExporter(BaseExporter):
     def __init__(self, manufacturers, config_name = None):
         super().__init__(manufacturers)
         self.manufacturer_ending = MANUFACTURER_ENDING
-        self.tooltips = parse_tooltips(self.tooltip_path)
+        self.tooltips = load_tooltips(self.tooltip_path)
         self.csv_separator = self.shop_csv_separator
         config_name = self.name() if config_name == None else config_name
         export_config_path = self.configs_base_directory + config_name + ".json"
@@ -42,6 +85,8 @@ class ShopExporter(BaseExporter):
             self.export_config = json.load(export_config_file, object_pairs_hook=OrderedDict)
 
         self.special_cases = dict(special_cases)
+        # Vorbereitete Spalten pro Anzahl iterierbarer Felder
+        self.column_plans = {}
 
         # Konfiguration des Exporters
         self.uses_manufacturer_information = True
@@ -54,83 +99,93 @@ class ShopExporter(BaseExporter):
         return self.output_directory() + manufacturer_name + ".csv"
 
     def header_fields(self, prod_fields, ilugg_fields):
+        return self.column_plan(prod_fields, ilugg_fields).header_fields
+
+    def column_plan(self, prod_fields, ilugg_fields):
+        # Die Spalten hängen nur von der Anzahl der iterierbaren Felder ab
+        # (aus Produkt oder ILUGG) und werden pro Anzahl einmal vorbereitet
+        iteration_maximums = tuple(
+            int(self.__get_value(value_specification["iterierbar"]["max"], prod_fields, ilugg_fields))
+            for value_specification in self.export_config.values()
+            if "iterierbar" in value_specification
+        )
+        if not iteration_maximums in self.column_plans:
+            self.column_plans[iteration_maximums] = self.build_column_plan(iteration_maximums)
+        return self.column_plans[iteration_maximums]
+
+    def build_column_plan(self, iteration_maximums):
         header_fields = []
+        columns = []
+        iteration_maximums = iter(iteration_maximums)
         for field_name, value_specification in self.export_config.items():
             if "iterierbar" in value_specification:
-                def make_header_field(specification, index):
+                specification = value_specification["iterierbar"]
+                start = 0 if not "start" in specification else int(specification["start"])
+                for index in range(start, next(iteration_maximums)):
                     header_fields.append(field_name + str(index))
-                self.__iterate(value_specification, prod_fields, ilugg_fields, make_header_field)
+                    columns.append(iterable_column(specification["praefix"] + str(index)))
             else:
                 header_fields.append(field_name)
+                if field_name in self.special_cases:
+                    columns.append(special_case_column(self.special_cases[field_name], value_specification))
+                else:
+                    columns.append(value_column(value_specification))
+        return ColumnPlan(header_fields, columns)
 
-        return header_fields
-
-    def __iterate(self, value_specification, prod_fields, ilugg_fields, callback):
-        specification = value_specification["iterierbar"]
-        max = int(self.__get_value(
-            specification["max"],
-            prod_fields,
-            ilugg_fields
-        ))
-        start = 0 if not "start" in specification else int(specification["start"])
-        while start < max:
-            callback(specification, start)
-            start += 1
-
-    def write_to_csv(self, parameters):
+    def render(self, parameters):
         prod_fields = parameters["fields"]
         attribute_names = parameters["attribute_names"]
         attribute_types = parameters["attribute_types"]
         ilugg_fields = parameters["manufacturer_information"]
-        manufacturer_name = parameters["manufacturer_name"]
 
-        has_exportflag = "EXPORTFLAG" in prod_fields
-        if has_exportflag:
+        if "EXPORTFLAG" in prod_fields:
             export_flag = prod_fields["EXPORTFLAG"]
             exportable_flags = ["export", "explicit"]
             if not export_flag in exportable_flags:
-                return "EXPORTFLAG = {}".format(export_flag)
+                return None, None, "EXPORTFLAG = {}".format(export_flag)
+
+        # Einmal pro Zeile bestimmt, für Header und Werte
+        plan = self.column_plan(prod_fields, ilugg_fields)
+        row = self.extract_information(plan, prod_fields, ilugg_fields, attribute_names, attribute_types)
+        return plan.header_fields, row, None
+
+    def write_to_csv(self, parameters):
+        prod_fields = parameters["fields"]
+        manufacturer_name = parameters["manufacturer_name"]
+        has_exportflag = "EXPORTFLAG" in prod_fields
+
+        header_fields, row, error_code = self.render(parameters)
+        if error_code != None:
+            return error_code
 
         csv_path = self.__csv_path(manufacturer_name)
-        self.maybe_create_csv(csv_path, self.header_fields(prod_fields, ilugg_fields))
-        row = self.extract_information(prod_fields, ilugg_fields, attribute_names, attribute_types)
+        self.maybe_create_csv(csv_path, header_fields)
         write_error_code =  self.write_csv_row(csv_path, row)
         if write_error_code == None and not has_exportflag:
             return "KEIN EXPORTFLAG (trotzdem in Export enthalten)"
         else:
             return write_error_code # könnte ein Fehler oder None sein, wenn alles funktioniert hat
 
-    def extract_information(self, prod_fields, ilugg_fields, attribute_names, attribute_types):
-        row = []
-
-        # Spezifizierte Felder in row schreiben
-        for field_name, value_specification in self.export_config.items():
-            if "iterierbar" in value_specification:
-                def get_iterable_value(specification, index):
-                    value = None
-                    field_name = specification["praefix"] + str(index)
-                    if field_name in prod_fields:
-                        value = prod_fields[field_name]
-                    row.append(value)
-
-                self.__iterate(value_specification, prod_fields, ilugg_fields, get_iterable_value)
-
-            else:
-                if field_name in self.special_cases:
-                    parameters = {
-                        "prod_fields": prod_fields,
-                        "ilugg_fields": ilugg_fields,
-                        "attribute_names": attribute_names,
-                        "attribute_types": attribute_types,
-                        "tooltips": self.tooltips,
-                        "specification": value_specification
-                    }
-                    value = self.special_cases[field_name](parameters)
-                else:
-                    value = self.__get_value(value_specification, prod_fields, ilugg_fields)
-
-                row.append(value)
-
+    def special_case_parameters(self, prod_fields, ilugg_fields, attribute_names, attribute_types):
+        return {
+            "prod_fields": prod_fields,
+            "ilugg_fields": ilugg_fields,
+            "attribute_names": attribute_names,
+            "attribute_types": attribute_types,
+            "tooltips": self.tooltips,
+            # Zwischenergebnisse der Sonderfälle für dieses Produkt
+            "memo": {}
+        }
+
+    def extract_information(self, plan, prod_fields, ilugg_fields, attribute_names, attribute_types):
+        parameters = self.special_case_parameters(prod_fields, ilugg_fields, attribute_names, attribute_types)
+        return self.extract_columns(plan, prod_fields, ilugg_fields, parameters)
+
+    def extract_columns(self, plan, prod_fields, ilugg_fields, parameters):
+        row = [
+            column(prod_fields, ilugg_fields, parameters)
+            for column in plan.columns
+        ]
         return list(map(escape, row))
 
     def __get_value(self, specification, prod_fields, ilugg_fields):
@@ -138,14 +193,7 @@ class ShopExporter(BaseExporter):
         if "wert" in specification:
             value = specification["wert"]
         elif "prod" in specification:
-            prod_field = specification["prod"]
-            if prod_field in prod_fields:
-                value = prod_fields[prod_field]
-                # Wenn das Feld ein Preisfeld ist, den Separator entfernen, damit der Shop das Komma
-                # nicht beim Separator setzt
-                if "PRICE" in prod_field and "," in value:
-                    value = value.replace(".", "")
-                    value = value.replace(",", ".")
+            value = get_prod_value(prod_fields, specification["prod"])
         elif "ilugg" in specification:
             ilugg_field = specification["ilugg"]
             if ilugg_field in ilugg_fields:
@@ -2,32 +2,53 @@ from .general import export_general_description
 from .details import export_details
 from .downloads import export_downloads
 from modules.constants import TECHDATA
-from modules.parser.gpsr import gpsr_get_configs, gpsr_process_template
+from modules.parser.gpsr import gpsr_get_engine
 
-def unescape_bsvp(text, prod_fields):
-    text = text.replace("$Artikelname$", prod_fields["NAME"])
-    text = text.replace("$Artikelnumber$", prod_fields["ARTNR"])
-    text = text.replace("$LP$", prod_fields["PRICE"])
+def placeholder_values(prod_fields):
+    return [
+        ("$Artikelname$", prod_fields["NAME"]),
+        ("$Artikelnumber$", prod_fields["ARTNR"]),
+        ("$LP$", prod_fields["PRICE"])
+    ]
+
+def replace_placeholders(text, values):
+    # Alle Platzhalter beginnen mit $
+    if not "$" in text:
+        return text
+    for placeholder, value in values:
+        text = text.replace(placeholder, value)
     return text
 
+def unescape_bsvp(text, prod_fields):
+    return replace_placeholders(text, placeholder_values(prod_fields))
+
 def export_description(parameters):
     prod_fields = parameters["prod_fields"]
     ilugg_fields = parameters["ilugg_fields"]
 
-    description = "<!--description-->"
-    description += export_general_description(parameters)
-    description += "<!--/description-->"
-    description += "<!--details-->"
+    # Die festen Kommentare können keine Platzhalter enthalten und trennen
+    # die Abschnitte, Platzhalter werden deshalb nur in den Abschnitten
+    # ersetzt
+    sections = [export_general_description(parameters)]
     if (TECHDATA in prod_fields and prod_fields[TECHDATA]):
-        description += export_details(parameters)
-    description += "<!--/details-->"
-    description += "<!--downloads-->"
-    description += export_downloads(prod_fields, ilugg_fields)
-    description += "<!--/downloads-->"
-
-    description += gpsr_render_description(prod_fields)
+        sections.append(export_details(parameters))
+    else:
+        sections.append("")
+    sections.append(export_downloads(prod_fields, ilugg_fields))
+    sections.append(gpsr_render_description(prod_fields))
 
-    return unescape_bsvp(description, prod_fields)
+    values = placeholder_values(prod_fields)
+    general, details, downloads, gpsr = [replace_placeholders(section, values) for section in sections]
+    return "".join([
+        "<!--description-->",
+        general,
+        "<!--/description--><!--details-->",
+        details,
+        "<!--/details--><!--downloads-->",
+        downloads,
+        "<!--/downloads-->",
+        gpsr
+    ])
 
 
 def gpsr_render_description(prod_fields):
@@ -36,24 +57,7 @@ def gpsr_render_description(prod_fields):
     if gpsr != "ja":
         return ""
 
-    result = {}
-
-    # Sort configs by priority (higher number, higher priority).
-    # Templates with higher priority overwrite templates with lower.
-    sorted_configs = sorted(gpsr_get_configs(), 
-                           key=lambda config: config.get("Priority", 0))
-    
-    for config in sorted_configs:
-        conditions_met = True
-        conditions = config.get("Conditions", {})
-        for field, value in conditions.items():
-            field_value = tech_data.get(field, "")
-            if str(field_value).lower() != str(value).lower():
-                conditions_met = False
-                break
-        if conditions_met:
-            for name, data in config.get("Templates", {}).items():
-                result[name] = gpsr_process_template(name, data)
+    result = gpsr_get_engine().render_templates(tech_data)
 
     if len(result) == 0:
         return ""
@@ -1,6 +1,26 @@
-from ..table import Table
+from ..table import TableSkeleton
 from ..utils.get_techdata_value import get_value
 from modules.constants import TECHDATA
+from modules.config_caches import get_cache
+
+# Maximale Anzahl gemerkter Tabellen
+MAX_CACHED_SKELETONS = 1024
+
+# Vorbereitete Tabellen pro Aufbau der technischen Daten, nur für die zuletzt
+# verwendeten Tooltips. Sie liegen bei den Konfigurationen, beim Neuladen
+# werden die bisherigen mit ihnen freigegeben.
+def get_table_skeleton(tooltips, layout):
+    cache = get_cache("table_skeletons")
+    current = cache.get("current")
+    if current == None or current[0] is not tooltips:
+        current = (tooltips, {})
+        cache["current"] = current
+    skeletons = current[1]
+    if not layout in skeletons:
+        if len(skeletons) >= MAX_CACHED_SKELETONS:
+            skeletons.clear()
+        skeletons[layout] = TableSkeleton(tooltips, layout)
+    return skeletons[layout]
 
 def export_details(parameters):
     prod_fields = parameters["prod_fields"]
@@ -8,13 +28,11 @@ def export_details(parameters):
     attribute_types = parameters["attribute_types"]
     tooltips = parameters["tooltips"]
     techdata = prod_fields[TECHDATA]
-    table = Table(tooltips)
-    for field_id, type in attribute_types.items():
-        attribute_name = get_value(attribute_names, field_id, warn=True)
-        if type == "HEAD":
-            table.make_empty_row()
-            table.make_header(attribute_name)
-        else:
-            attribute_value = get_value(techdata, field_id)
-            table.make_row(attribute_name, attribute_value)
-    return table.to_string()
+    # Überschriften und Beschreibungen sind für Produkte mit gleicher Maske
+    # gleich, nur die Werte werden pro Produkt eingesetzt
+    layout = tuple(
+        (field_id, type, get_value(attribute_names, field_id, warn=True))
+        for field_id, type in attribute_types.items()
+    )
+    table_skeleton = get_table_skeleton(tooltips, layout)
+    return table_skeleton.to_string(lambda field_id: get_value(techdata, field_id))
@@ -1,4 +1,4 @@
-from modules.logger import Logger
+from modules.logger import Logger, WARN
 
 def placeholder(index):
     return "$BT_Passage{}$".format(index)
@@ -11,17 +11,19 @@ def get_welcome_text(prod_fields, ilugg_fields):
     welcome_text = ""
 
     if not "ARTWELCOMESTATE" in prod_fields:
-        Logger().log("[WARNUNG] {} hat kein ARTWELCOMESTATE Feld".format(
-            prod_fields["ARTNR"]
-        ))
+        Logger().log("[WARNUNG] {} hat kein ARTWELCOMESTATE Feld",
+            prod_fields["ARTNR"],
+            level=WARN
+        )
         return welcome_text
     welcome_state = prod_fields["ARTWELCOMESTATE"]
 
     if welcome_state == "0":
         if not "WELCOMETHISTEXT" in prod_fields:
-            Logger().log("[WARNUNG] {} mit ARTWELCOMESTATE 0 hat kein WELCOMETHISTEXT Feld".format(
-                prod_fields["ARTNR"]
-            ))
+            Logger().log("[WARNUNG] {} mit ARTWELCOMESTATE 0 hat kein WELCOMETHISTEXT Feld",
+                prod_fields["ARTNR"],
+                level=WARN
+            )
             return welcome_text
         welcome_text = prod_fields["WELCOMETHISTEXT"]
 
@@ -33,9 +35,10 @@ def get_welcome_text(prod_fields, ilugg_fields):
 
     if welcome_state == "2":
         if not "WELCOMETEXT" in prod_fields:
-            Logger().log("[WARNUNG] {} mit ARTWELCOMESTATE 2 hat kein WELCOMETEXT Feld".format(
-                prod_fields["ARTNR"]
-            ))
+            Logger().log("[WARNUNG] {} mit ARTWELCOMESTATE 2 hat kein WELCOMETEXT Feld",
+                prod_fields["ARTNR"],
+                level=WARN
+            )
             return welcome_text
         welcome_text = prod_fields["WELCOMETEXT"]
 
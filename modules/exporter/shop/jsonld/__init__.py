@@ -7,9 +7,9 @@ Generates structured schema product data for AI bots and Google
 from .mapping_loader import identify_product_type, load_mapping
 from .product_fields import generate_product_fields
 from .additional_properties import generate_additional_properties
-from .normalizer import get_product_name
+from .normalizer import get_product_name, format_techdata
 from .renderer import render_script_tag
-from modules.logger import Logger
+from modules.logger import Logger, DEBUG, INFO, WARN, SKIP
 
 
 def export_jsonld(parameters):
@@ -19,72 +19,74 @@ def export_jsonld(parameters):
     product_name = get_product_name(prod_fields)
     product_artnr = prod_fields.get("ARTNR", "N/A")
 
-    logger.log("")
-    logger.log(f"[JSON-LD] ========== Starting JSON-LD export for product: '{product_name}' (ARTNR: {product_artnr}) ==========")
+    logger.log("", level=DEBUG)
+    logger.log("[JSON-LD] ========== Starting JSON-LD export for product: '{}' (ARTNR: {}) ==========", product_name, product_artnr, level=DEBUG)
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Identifying product type")
+    logger.log("[JSON-LD] Product '{}': Identifying product type", product_name, level=DEBUG)
     product_type = identify_product_type(prod_fields)
 
     if not product_type:
-        logger.log(f"[JSON-LD] Product '{product_name}': SKIPPED - No product type identified (field 0000191 is empty)")
-        logger.log(f"[JSON-LD] ========== Finished (skipped) ==========")
-        logger.log("")
+        logger.log("[JSON-LD] Product '{}': SKIPPED - No product type identified (field 0000191 is empty)", product_name, level=SKIP)
+        logger.log("[JSON-LD] ========== Finished (skipped) ==========", level=DEBUG)
+        logger.log("", level=DEBUG)
         return None
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Product type identified as '{product_type}'")
+    logger.log("[JSON-LD] Product '{}': Product type identified as '{}'", product_name, product_type, level=DEBUG)
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Loading mapping configuration")
+    logger.log("[JSON-LD] Product '{}': Loading mapping configuration", product_name, level=DEBUG)
     mapping = load_mapping(product_type)
 
     if not mapping:
-        logger.log(f"[JSON-LD] [WARNING] Product '{product_name}': SKIPPED - No mapping configured for product type '{product_type}'")
-        logger.log(f"[JSON-LD] ========== Finished (skipped) ==========")
-        logger.log("")
+        logger.log("[JSON-LD] [WARNING] Product '{}': SKIPPED - No mapping configured for product type '{}'", product_name, product_type, level=SKIP)
+        logger.log("[JSON-LD] ========== Finished (skipped) ==========", level=DEBUG)
+        logger.log("", level=DEBUG)
         return None
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Building JSON-LD structure")
+    logger.log("[JSON-LD] Product '{}': Building JSON-LD structure", product_name, level=DEBUG)
     jsonld_data = {
         "@context": "https://schema.org",
         "@type": "Product",
         "@id": "#product"
     }
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Generating product fields")
-    product_fields = generate_product_fields(prod_fields, mapping)
+    techdata_values = format_techdata(prod_fields, mapping.techdata_ids)
+
+    logger.log("[JSON-LD] Product '{}': Generating product fields", product_name, level=DEBUG)
+    product_fields = generate_product_fields(prod_fields, mapping, techdata_values)
     if product_fields:
         jsonld_data.update(product_fields)
-        logger.log(f"[JSON-LD] Product '{product_name}': Product fields added successfully")
+        logger.log("[JSON-LD] Product '{}': Product fields added successfully", product_name, level=DEBUG)
     else:
-        logger.log(f"[JSON-LD] Product '{product_name}': No product fields generated")
+        logger.log("[JSON-LD] Product '{}': No product fields generated", product_name, level=DEBUG)
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Generating additional properties")
-    additional_props = generate_additional_properties(prod_fields, mapping)
+    logger.log("[JSON-LD] Product '{}': Generating additional properties", product_name, level=DEBUG)
+    additional_props = generate_additional_properties(prod_fields, mapping, techdata_values)
     if additional_props:
         jsonld_data["additionalProperty"] = additional_props
-        logger.log(f"[JSON-LD] Product '{product_name}': Additional properties added successfully")
+        logger.log("[JSON-LD] Product '{}': Additional properties added successfully", product_name, level=DEBUG)
     else:
-        logger.log(f"[JSON-LD] Product '{product_name}': No additional properties generated")
+        logger.log("[JSON-LD] Product '{}': No additional properties generated", product_name, level=DEBUG)
 
     total_fields = len(jsonld_data)
-    logger.log(f"[JSON-LD] Product '{product_name}': Validating generated data (total fields: {total_fields})")
+    logger.log("[JSON-LD] Product '{}': Validating generated data (total fields: {})", product_name, total_fields, level=DEBUG)
 
     if total_fields <= 2:
-        logger.log(f"[JSON-LD] Product '{product_name}': SKIPPED - No useful data generated (only @context and @type)")
-        logger.log(f"[JSON-LD] ========== Finished (skipped - no data) ==========")
-        logger.log("")
+        logger.log("[JSON-LD] Product '{}': SKIPPED - No useful data generated (only @context and @type)", product_name, level=SKIP)
+        logger.log("[JSON-LD] ========== Finished (skipped - no data) ==========", level=DEBUG)
+        logger.log("", level=DEBUG)
         return None
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Rendering script tag")
+    logger.log("[JSON-LD] Product '{}': Rendering script tag", product_name, level=DEBUG)
     script_tag = render_script_tag(jsonld_data)
     
     if script_tag:
-        logger.log(f"[JSON-LD] Product '{product_name}': SUCCESS - JSON-LD export completed successfully")
-        logger.log(f"[JSON-LD] ========== Finished (success) ==========")
+        logger.log("[JSON-LD] Product '{}': SUCCESS - JSON-LD export completed successfully", product_name, level=INFO)
+        logger.log("[JSON-LD] ========== Finished (success) ==========", level=DEBUG)
     else:
-        logger.log(f"[JSON-LD] Product '{product_name}': FAILED - Rendering returned None")
-        logger.log(f"[JSON-LD] ========== Finished (failed) ==========")
+        logger.log("[JSON-LD] Product '{}': FAILED - Rendering returned None", product_name, level=WARN)
+        logger.log("[JSON-LD] ========== Finished (failed) ==========", level=DEBUG)
     
-    logger.log("")
+    logger.log("", level=DEBUG)
     
     return script_tag
 
@@ -4,43 +4,36 @@ Additional properties generator for JSON-LD export
 Builds additionalProperty array from technical mask fields
 """
 
-from .normalizer import parse_template, get_product_name, strip_unit_suffix
-from .mapping_loader import load_mappings
-from modules.logger import Logger
+from .normalizer import get_product_name, strip_unit_suffix
+from modules.logger import Logger, DEBUG, INFO, WARN
 
 
-def generate_additional_properties(prod_fields, mapping):
-    property_ids = mapping.get("additional_properties", [])
+def generate_additional_properties(prod_fields, mapping, techdata_values=None):
+    property_entries = mapping.additional_properties
     logger = Logger()
 
     product_name = get_product_name(prod_fields)
-    total_properties = len(property_ids)
-    logger.log(f"[JSON-LD] Product '{product_name}': Processing {total_properties} additional properties")
-
-    mappings = load_mappings()
-    property_definitions = mappings.get("property_definitions", {})
+    total_properties = len(property_entries)
+    logger.log("[JSON-LD] Product '{}': Processing {} additional properties", product_name, total_properties, level=DEBUG)
 
     additional_properties = []
     skipped_empty_value = 0
     skipped_missing_config = 0
 
-    for property_id in property_ids:
-        prop_def = property_definitions.get(property_id)
-
+    for property_id, prop_def, template in property_entries:
         if not prop_def:
             skipped_missing_config += 1
             #logger.log(f"[JSON-LD] [WARNING] Product '{product_name}': Property definition not found for ID: '{property_id}'")
             continue
 
-        template = prop_def.get("value")
         name = prop_def.get("name")
 
-        if not template or not name:
+        if not template:
             skipped_missing_config += 1
-            logger.log(f"[JSON-LD] [WARNING] Product '{product_name}': Property definition '{property_id}' missing value or name: {prop_def}")
+            logger.log("[JSON-LD] [WARNING] Product '{}': Property definition '{}' missing value or name: {}", product_name, property_id, prop_def, level=WARN)
             continue
 
-        resolved_value = parse_template(template, prod_fields, log_field_name=f"property '{name}'")
+        resolved_value = template.fill(prod_fields, log_field_name=f"property '{name}'", techdata_values=techdata_values)
 
         if resolved_value is None:
             skipped_empty_value += 1
@@ -57,13 +50,13 @@ def generate_additional_properties(prod_fields, mapping):
             stripped_value, was_stripped = strip_unit_suffix(resolved_value, unit)
             if was_stripped:
                 property_value["value"] = stripped_value
-                logger.log(f"[JSON-LD] [INFO] Product '{product_name}': Property '{name}' - removed duplicate unit: '{resolved_value}' -> '{stripped_value}'")
-            logger.log(f"[JSON-LD] [INFO] Product '{product_name}': Property '{name}' = '{property_value['value']}' (unit: '{unit}') (template: '{template}')")
+                logger.log("[JSON-LD] [INFO] Product '{}': Property '{}' - removed duplicate unit: '{}' -> '{}'", product_name, name, resolved_value, stripped_value, level=DEBUG)
+            logger.log("[JSON-LD] [INFO] Product '{}': Property '{}' = '{}' (unit: '{}') (template: '{}')", product_name, name, property_value['value'], unit, template.template, level=DEBUG)
         else:
-            logger.log(f"[JSON-LD] [INFO] Product '{product_name}': Property '{name}' = '{resolved_value}' (template: '{template}')")
+            logger.log("[JSON-LD] [INFO] Product '{}': Property '{}' = '{}' (template: '{}')", product_name, name, resolved_value, template.template, level=DEBUG)
 
         additional_properties.append(property_value)
 
-    logger.log(f"[JSON-LD] Product '{product_name}': Additional properties summary - Total: {total_properties}, Added: {len(additional_properties)}, Skipped (empty): {skipped_empty_value}, Skipped (config error): {skipped_missing_config}")
+    logger.log("[JSON-LD] Product '{}': Additional properties summary - Total: {}, Added: {}, Skipped (empty): {}, Skipped (config error): {}", product_name, total_properties, len(additional_properties), skipped_empty_value, skipped_missing_config, level=INFO)
 
     return additional_properties if additional_properties else None
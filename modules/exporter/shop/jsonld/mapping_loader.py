@@ -6,39 +6,45 @@ Mapping configuration loader for JSON-LD export
 import json
 import os
 from modules.constants import JSONLD_MAPPING_PATH
-from modules.logger import Logger
+from modules.logger import Logger, DEBUG, INFO, WARN
+from modules.config_caches import get_cache, clear_cache
+from modules.source_signatures import record_sources
+from .normalizer import CompiledTemplate
 
 
-_mapping_cache = None
+def mapping_cache():
+    """Loaded mapping file ("mappings") and its plans ("plans"), swapped as a whole on reload."""
+    return get_cache("jsonld_mapping")
 
 
 def load_mappings():
-    global _mapping_cache
-
-    if _mapping_cache is not None:
-        return _mapping_cache
+    cache = mapping_cache()
+    mappings = cache.get("mappings")
+    if mappings is not None:
+        return mappings
 
     mapping_path = JSONLD_MAPPING_PATH
     logger = Logger()
+    record_sources([mapping_path])
 
     if not os.path.exists(mapping_path):
-        logger.log(f"[JSON-LD] [WARNING] Mapping file not found: {mapping_path}")
-        _mapping_cache = {}
-        return _mapping_cache
+        logger.log("[JSON-LD] [WARNING] Mapping file not found: {}", mapping_path, level=WARN)
+        cache["mappings"] = {}
+        return cache["mappings"]
 
     try:
         with open(mapping_path, 'r', encoding='utf-8') as f:
-            _mapping_cache = json.load(f)
-        logger.log(f"[JSON-LD] [INFO] Loaded {len(_mapping_cache)} product type mappings from {mapping_path}")
-        return _mapping_cache
+            cache["mappings"] = json.load(f)
+        logger.log("[JSON-LD] [INFO] Loaded {} product type mappings from {}", len(cache["mappings"]), mapping_path, level=INFO)
+        return cache["mappings"]
     except json.JSONDecodeError as e:
-        logger.log(f"[JSON-LD] [ERROR] Failed to parse mapping file: {e}")
-        _mapping_cache = {}
-        return _mapping_cache
+        logger.log("[JSON-LD] [ERROR] Failed to parse mapping file: {}", e, level=WARN)
+        cache["mappings"] = {}
+        return cache["mappings"]
     except Exception as e:
-        logger.log(f"[JSON-LD] [ERROR] Failed to load mapping file: {e}")
-        _mapping_cache = {}
-        return _mapping_cache
+        logger.log("[JSON-LD] [ERROR] Failed to load mapping file: {}", e, level=WARN)
+        cache["mappings"] = {}
+        return cache["mappings"]
 
 
 def identify_product_type(prod_fields):
@@ -52,48 +58,115 @@ def identify_product_type(prod_fields):
         logger = Logger()
         from .normalizer import get_product_name
         product_name = get_product_name(prod_fields)
-        logger.log(f"[JSON-LD] [INFO] Product '{product_name}': No product type found (field 0000191 empty)")
+        logger.log("[JSON-LD] [INFO] Product '{}': No product type found (field 0000191 empty)", product_name, level=DEBUG)
 
     return product_type if product_type else None
 
 
+class MappingPlan:
+    """Mapping of one product type with pre-tokenized templates, built once per loaded mapping file."""
+
+    def __init__(self, product_fields, product_config, property_definitions):
+        # Copy product fields (can be overridden by product-type-specific config)
+        merged_fields = dict(product_fields)
+
+        # Override product fields with product-type-specific fields if present
+        if "product" in product_config:
+            merged_fields.update(product_config["product"])
+
+        # (field_name, field_config, field_type, template, extra keys); field_type and
+        # template stay None for invalid configs, which are logged per product
+        self.product_fields = []
+        for field_name, field_config in merged_fields.items():
+            if not isinstance(field_config, dict):
+                self.product_fields.append((field_name, field_config, None, None, None))
+                continue
+            template = field_config.get("value")
+            self.product_fields.append((
+                field_name,
+                field_config,
+                field_config.get("type", "simple"),
+                CompiledTemplate(template) if template else None,
+                [(key, val) for key, val in field_config.items() if key not in ("type", "value")]
+            ))
+
+        # (property_id, prop_def, template); prop_def is None for unknown
+        # properties, template is None for incomplete definitions
+        property_ids = product_config.get("additional_properties", [])
+        self.additional_properties = []
+        for property_id in property_ids:
+            prop_def = property_definitions.get(property_id)
+            template = None
+            if prop_def and prop_def.get("value") and prop_def.get("name"):
+                template = CompiledTemplate(prop_def.get("value"))
+            self.additional_properties.append((property_id, prop_def, template))
+
+        # Every TECHDATA field used by a template, formatted once per product
+        self.techdata_ids = []
+        templates = [entry[3] for entry in self.product_fields] + [entry[2] for entry in self.additional_properties]
+        for template in templates:
+            if template:
+                for field_id in template.techdata_ids:
+                    if field_id not in self.techdata_ids:
+                        self.techdata_ids.append(field_id)
+
+
+class MappingPlans:
+    """Plans of all product types for one loaded mapping file."""
+
+    def __init__(self, mappings):
+        self.mappings = mappings
+        self.product_types = mappings.get("product_types", {})
+        self.lower_map = {k.lower(): k for k in self.product_types}
+        self.plans = {}
+
+    def get(self, product_type):
+        plan = self.plans.get(product_type)
+        if plan is None:
+            plan = MappingPlan(
+                self.mappings.get("product", {}),
+                self.product_types[product_type],
+                self.mappings.get("property_definitions", {})
+            )
+            self.plans[product_type] = plan
+        return plan
+
+
+def load_mapping_plans():
+    # Plans are rebuilt whenever a new mapping file has been loaded
+    mappings = load_mappings()
+    cache = mapping_cache()
+    mapping_plans = cache.get("plans")
+    if mapping_plans is None or mapping_plans.mappings is not mappings:
+        mapping_plans = MappingPlans(mappings)
+        cache["plans"] = mapping_plans
+    return mapping_plans
+
+
 def load_mapping(product_type):
     if not product_type:
         return None
 
-    mappings = load_mappings()
+    mapping_plans = load_mapping_plans()
     logger = Logger()
 
-    product_types = mappings.get("product_types", {})
-    product_fields = mappings.get("product", {})
-
     # Try exact match first, then case-insensitive
-    if product_type in product_types:
-        logger.log(f"[JSON-LD] [INFO] Found mapping for product type: '{product_type}'")
-        product_config = product_types[product_type]
-    else:
-        lower_map = {k.lower(): k for k in product_types}
-        original_key = lower_map.get(product_type.lower())
-        if original_key:
-            logger.log(f"[JSON-LD] [INFO] Found mapping for product type: '{product_type}' (case-insensitive match with '{original_key}')")
-            product_config = product_types[original_key]
-        else:
-            return None
-
-    # Copy product fields (can be overridden by product-type-specific config)
-    merged_config = {"product": dict(product_fields)}
-
-    # Override product fields with product-type-specific fields if present
-    if "product" in product_config:
-        merged_config["product"].update(product_config["product"])
+    if product_type in mapping_plans.product_types:
+        logger.log("[JSON-LD] [INFO] Found mapping for product type: '{}'", product_type, level=DEBUG)
+        return mapping_plans.get(product_type)
 
-    if "additional_properties" in product_config:
-        merged_config["additional_properties"] = product_config["additional_properties"]
+    original_key = mapping_plans.lower_map.get(product_type.lower())
+    if original_key:
+        logger.log("[JSON-LD] [INFO] Found mapping for product type: '{}' (case-insensitive match with '{}')", product_type, original_key, level=DEBUG)
+        return mapping_plans.get(original_key)
 
-    return merged_config
+    return None
 
 
 def reload_mappings():
-    global _mapping_cache
-    _mapping_cache = None
+    clear_mapping_cache()
     return load_mappings()
+
+
+def clear_mapping_cache():
+    clear_cache("jsonld_mapping")
@@ -4,8 +4,9 @@ Unit normalization and value validation utilities for JSON-LD export
 """
 
 import re
-from modules.logger import Logger
-from modules.formatter import format_field, format_options_jsonld
+from modules.logger import Logger, DEBUG, WARN
+from modules.formatter import format_field, load_format_options
+from modules.constants import FORMATTING_JSONLD_CONFIG_FILE
 
 
 def get_product_name(prod_fields):
@@ -22,43 +23,97 @@ def strip_unit_suffix(value, unit):
     return value, False
 
 
-def parse_template(template, prod_fields, log_field_name=None):
+TEMPLATE_PATTERN = re.compile(r'\$([A-Z]+)::([^\$]+)\$')
+
+# Values containing one of these texts count as placeholders, not as data
+INVALID_VALUES = [
+    "keine angabe",
+    "keine werte vorhanden",
+    "nicht vorhanden",
+    "keine",
+    "kein neuer eintrag einfügen",
+    "xxxx",
+    "$",
+]
+INVALID_VALUE_PATTERN = re.compile("|".join(re.escape(invalid) for invalid in INVALID_VALUES))
+
+
+class CompiledTemplate:
+    """Template split once into literal text and its placeholders."""
+
+    def __init__(self, template):
+        self.template = template
+        self.texts = []
+        self.placeholders = []
+        position = 0
+        for match in TEMPLATE_PATTERN.finditer(template):
+            self.texts.append(template[position:match.start()])
+            self.placeholders.append((match.group(1), match.group(2), match.group(0)))
+            position = match.end()
+        self.texts.append(template[position:])
+        self.techdata_ids = [field_id for source, field_id, placeholder in self.placeholders if source == "TECHDATA"]
+
+    def fill(self, prod_fields, log_field_name=None, techdata_values=None):
+        if not self.placeholders:
+            return self.template
+
+        logger = Logger()
+        if techdata_values is None:
+            techdata_values = format_techdata(prod_fields, self.techdata_ids)
+
+        result = [self.texts[0]]
+
+        for (source, field_id, placeholder), text in zip(self.placeholders, self.texts[1:]):
+            if source == "TECHDATA":
+                value, log_lines = techdata_values[field_id]
+                logger.replay(log_lines)
+            elif source == "PROD":
+                value = prod_fields.get(field_id)
+            else:
+                if log_field_name:
+                    logger.log("[JSON-LD] [WARNING] Template for '{}': Invalid source '{}' in placeholder '{}'", log_field_name, source, placeholder, level=WARN)
+                return None
+
+            if is_empty_value(value):
+                if log_field_name:
+                    logger.log("[JSON-LD] [DEBUG] Template for '{}': Placeholder '{}' has empty value, skipping entire template", log_field_name, placeholder, level=DEBUG)
+                return None
+
+            result.append(str(value))
+            result.append(text)
+
+        return "".join(result).strip()
+
+
+def format_techdata(prod_fields, field_ids):
+    """Format each required TECHDATA value once, keeping the log lines to repeat them on every use."""
     logger = Logger()
+    techdata = prod_fields.get("TECHDATA", {})
+    format_options = load_format_options(FORMATTING_JSONLD_CONFIG_FILE)
+    techdata_values = {}
+
+    for field_id in field_ids:
+        if field_id in techdata_values:
+            continue
+        value = techdata.get(field_id)
+        log_lines = []
+        if value is not None and isinstance(value, str):
+            raw_value = value
+            try:
+                with logger.captured() as log_lines:
+                    value = format_field(value, field_id, format_options)
+            except Exception:
+                logger.replay(log_lines)
+                raise
+            if value != raw_value and logger.is_enabled(DEBUG):
+                log_lines.append(("[JSON-LD] [DEBUG] Formatted '{}': '{}' -> '{}'", (field_id, raw_value, value), DEBUG))
+        techdata_values[field_id] = (value, tuple(log_lines))
+
+    return techdata_values
 
-    pattern = r'\$([A-Z]+)::([^\$]+)\$'
-    matches = re.findall(pattern, template)
-
-    if not matches:
-        return template
-
-    result = template
-
-    for source, field_id in matches:
-        placeholder = f"${source}::{field_id}$"
-
-        if source == "TECHDATA":
-            techdata = prod_fields.get("TECHDATA", {})
-            value = techdata.get(field_id)
-            if value is not None and isinstance(value, str):
-                raw_value = value
-                value = format_field(value, field_id, format_options_jsonld)
-                if value != raw_value:
-                    logger.log(f"[JSON-LD] [DEBUG] Formatted '{field_id}': '{raw_value}' -> '{value}'")
-        elif source == "PROD":
-            value = prod_fields.get(field_id)
-        else:
-            if log_field_name:
-                logger.log(f"[JSON-LD] [WARNING] Template for '{log_field_name}': Invalid source '{source}' in placeholder '{placeholder}'")
-            return None
-
-        if is_empty_value(value):
-            if log_field_name:
-                logger.log(f"[JSON-LD] [DEBUG] Template for '{log_field_name}': Placeholder '{placeholder}' has empty value, skipping entire template")
-            return None
-
-        result = result.replace(placeholder, str(value))
 
-    return result.strip()
+def parse_template(template, prod_fields, log_field_name=None):
+    return CompiledTemplate(template).fill(prod_fields, log_field_name)
 
 
 def normalize_decimal(value, field_name=None, log_errors=True):
@@ -78,7 +133,7 @@ def normalize_decimal(value, field_name=None, log_errors=True):
             if log_errors:
                 logger = Logger()
                 field_info = f" for field '{field_name}'" if field_name else ""
-                logger.log(f"[JSON-LD] [WARNING] Failed to convert '{original_value}' to numeric value{field_info}")
+                logger.log("[JSON-LD] [WARNING] Failed to convert '{}' to numeric value{}", original_value, field_info, level=WARN)
             return value
 
     return value
@@ -89,7 +144,7 @@ def is_empty_value(value, log_reason=False, field_name=None):
         if log_reason:
             logger = Logger()
             field_info = f" (field: {field_name})" if field_name else ""
-            logger.log(f"[JSON-LD] [DEBUG] Value is None{field_info}")
+            logger.log("[JSON-LD] [DEBUG] Value is None{}", field_info, level=DEBUG)
         return True
 
     if isinstance(value, str):
@@ -100,26 +155,16 @@ def is_empty_value(value, log_reason=False, field_name=None):
             if log_reason:
                 logger = Logger()
                 field_info = f" (field: {field_name})" if field_name else ""
-                logger.log(f"[JSON-LD] [DEBUG] Value is empty string{field_info}")
+                logger.log("[JSON-LD] [DEBUG] Value is empty string{}", field_info, level=DEBUG)
             return True
 
-        invalid_values = [
-            "keine angabe",
-            "keine werte vorhanden",
-            "nicht vorhanden",
-            "keine",
-            "kein neuer eintrag einfügen",
-            "xxxx",
-            "$",
-        ]
-
         value_lower = value.lower()
-        for invalid in invalid_values:
-            if invalid in value_lower:
-                if log_reason:
-                    logger = Logger()
-                    field_info = f" (field: {field_name})" if field_name else ""
-                    logger.log(f"[JSON-LD] [DEBUG] Value '{original_value}' matches placeholder pattern '{invalid}'{field_info}")
-                return True
+        if INVALID_VALUE_PATTERN.search(value_lower):
+            if log_reason:
+                logger = Logger()
+                field_info = f" (field: {field_name})" if field_name else ""
+                invalid = next(invalid for invalid in INVALID_VALUES if invalid in value_lower)
+                logger.log("[JSON-LD] [DEBUG] Value '{}' matches placeholder pattern '{}'{}", original_value, invalid, field_info, level=DEBUG)
+            return True
 
     return False
@@ -4,26 +4,28 @@ JSON-LD renderer for generating final script tag output
 """
 
 import json
-from modules.logger import Logger
+from modules.logger import Logger, DEBUG, WARN
 
 
 def render_script_tag(jsonld_data):
     logger = Logger()
 
     if not jsonld_data:
-        logger.log("[JSON-LD] [WARNING] render_script_tag called with empty jsonld_data")
+        logger.log("[JSON-LD] [WARNING] render_script_tag called with empty jsonld_data", level=WARN)
         return None
 
     try:
         json_string = json.dumps(jsonld_data, ensure_ascii=False, separators=(',', ':'))
 
-        logger.log(f"[JSON-LD] [INFO] Rendered JSON-LD ({len(json_string)} characters, {len(jsonld_data)} top-level fields)")
+        logger.log("[JSON-LD] [INFO] Rendered JSON-LD ({} characters, {} top-level fields)", len(json_string), len(jsonld_data), level=DEBUG)
 
-        pretty_json = json.dumps(jsonld_data, ensure_ascii=False, indent=2)
-        logger.log(f"[JSON-LD] [INFO] JSON-LD Output (pretty-printed):")
-        logger.log(pretty_json)
+        # The pretty print is only built for DEBUG logs
+        if logger.is_enabled(DEBUG):
+            pretty_json = json.dumps(jsonld_data, ensure_ascii=False, indent=2)
+            logger.log("[JSON-LD] [INFO] JSON-LD Output (pretty-printed):", level=DEBUG)
+            logger.log(pretty_json, level=DEBUG)
 
         return json_string
     except (TypeError, ValueError) as e:
-        logger.log(f"[JSON-LD] [ERROR] Failed to serialize JSON-LD data: {e}")
+        logger.log("[JSON-LD] [ERROR] Failed to serialize JSON-LD data: {}", e, level=WARN)
         return None
@@ -1,6 +1,7 @@
 import math
-from modules.logger import Logger
+from modules.logger import Logger, WARN
 from modules.constants import ARTICLE_NUMBER
+from .utils.row_memo import memoized, row_cached
 
 def finalize_price(price):
     return str(math.floor(price))
@@ -17,27 +18,90 @@ def get_number(string):
 def get_catalog_price(prod_fields):
     return get_number(prod_fields["PRICE"])
 
+# Anzahl der ILUGG Dateien, deren Preistabellen gemerkt werden
+MAX_CACHED_PRICE_TABLES = 64
+
+class PriceTables():
+    # Faktoren und Mindestpreis-Formel einer ILUGG Datei, werden einmal pro
+    # Hersteller statt für jedes Produkt zerlegt. Zahlen werden erst bei der
+    # ersten Verwendung umgewandelt, damit Fehler wie bisher nur bei
+    # betroffenen Produkten auftreten.
+    #
+    # Die Preise werden weiterhin pro Produkt berechnet und nicht für alle
+    # Produkte eines Herstellers auf einmal (z.B. mit NumPy): pro Produkt
+    # bleiben nur zwei Multiplikationen und math.floor, aufwendig war das
+    # wiederholte Zerlegen der ILUGG Felder. So bleiben Ergebnisse, Fehler
+    # und Logs je Produkt wie bisher, ohne zusätzliche Abhängigkeit.
+    def __init__(self, ilugg_fields):
+        self.ilugg_fields = ilugg_fields
+        self.factor_tables = {}
+        self.numbers = {}
+        self.min_price_rule = None
+
+    def factor_table(self, ilugg_field):
+        # Faktor pro Kategorie, bei doppelten Kategorien gilt die erste
+        factor_table = self.factor_tables.get(ilugg_field)
+        if factor_table == None:
+            factor_table = {}
+            for factor_definition in self.ilugg_fields[ilugg_field].split("§"):
+                if ":" in factor_definition:
+                    factor_table.setdefault(factor_definition.split(":")[0], factor_definition.split(":")[1])
+            self.factor_tables[ilugg_field] = factor_table
+        return factor_table
+
+    def number(self, string):
+        number = self.numbers.get(string)
+        if number == None:
+            number = get_number(string)
+            self.numbers[string] = number
+        return number
+
+    def get_min_price_rule(self):
+        if self.min_price_rule == None:
+            factor_definition = self.ilugg_fields["MinPriceFormular"]
+            # IF ($EK<threshold) THEN ($EK*greater_factor) ELSE ($EK*smaller_factor)
+            split_character = " "
+            factor_definition_parts = factor_definition.replace("IF ($EK<", "")
+            factor_definition_parts = factor_definition_parts.replace(") THEN ($EK*", split_character)
+            factor_definition_parts = factor_definition_parts.replace(") ELSE ($EK*", split_character)
+            factor_definition_parts = factor_definition_parts.replace(")", "")
+            values = factor_definition_parts.split(split_character)
+            self.min_price_rule = (
+                get_number(values[0]),
+                get_number(values[1]),
+                get_number(values[2])
+            )
+        return self.min_price_rule
+
+price_tables = {}
+
+def get_price_tables(ilugg_fields):
+    tables = price_tables.get(id(ilugg_fields))
+    if tables == None or tables.ilugg_fields is not ilugg_fields:
+        if len(price_tables) >= MAX_CACHED_PRICE_TABLES:
+            price_tables.clear()
+        tables = PriceTables(ilugg_fields)
+        price_tables[id(ilugg_fields)] = tables
+    return tables
+
 def get_factor(prod_fields, prod_field, ilugg_fields, ilugg_field):
     prod_definition = prod_fields[prod_field]
-    ilugg_definition = ilugg_fields[ilugg_field]
+    tables = get_price_tables(ilugg_fields)
     factor_category = prod_definition.split(":")[0]
-    factor_definitions = ilugg_definition.split("§")
-    factor = None
-    for factor_definition in factor_definitions:
-        if factor_definition.startswith("{}:".format(factor_category)):
-            factor = factor_definition.split(":")[1]
-            break
-    if factor == None:
-        logger = Logger()
-        factor = prod_definition
-        if ":" in factor:
-            factor = factor.split(":")[1]
-        log_text = "{}: Faktor zur Preisberechnung".format(prod_fields[ARTICLE_NUMBER])
-        log_text += " konnte nicht bestimmt werden."
-        log_text += " {} in PROD ist '{}',".format(prod_field, prod_definition)
-        log_text += " {} in ILUGG ist '{}'.".format(ilugg_field, ilugg_definition)
-        log_text += " {} wird als Faktor angenommen.".format(factor)
-        logger.log(log_text)
+    factor = tables.factor_table(ilugg_field).get(factor_category)
+    if factor != None:
+        return tables.number(factor)
+    ilugg_definition = ilugg_fields[ilugg_field]
+    logger = Logger()
+    factor = prod_definition
+    if ":" in factor:
+        factor = factor.split(":")[1]
+    log_text = "{}: Faktor zur Preisberechnung".format(prod_fields[ARTICLE_NUMBER])
+    log_text += " konnte nicht bestimmt werden."
+    log_text += " {} in PROD ist '{}',".format(prod_field, prod_definition)
+    log_text += " {} in ILUGG ist '{}'.".format(ilugg_field, ilugg_definition)
+    log_text += " {} wird als Faktor angenommen.".format(factor)
+    logger.log(log_text, level=WARN)
     return get_number(factor)
 
 def get_purchasing_price(prod_fields, ilugg_fields):
@@ -49,6 +113,14 @@ def get_purchasing_price(prod_fields, ilugg_fields):
     purchasing_price = catalog_price * discount
     return purchasing_price
 
+def get_row_purchasing_price(parameters):
+    return memoized(
+        parameters,
+        "purchasing_price",
+        lambda: get_purchasing_price(parameters["prod_fields"], parameters["ilugg_fields"])
+    )
+
+@row_cached
 def export_price(parameters):
     def get_user_factor(prod_fields, ilugg_fields):
         return get_factor(prod_fields, "USERFAKTVK", ilugg_fields, "UFAKTVK")
@@ -59,7 +131,7 @@ def export_price(parameters):
     user_factor = get_user_factor(prod_fields, ilugg_fields)
     base_price = None
     if price_base == "NettoPrice":
-        base_price = get_purchasing_price(prod_fields, ilugg_fields)
+        base_price = get_row_purchasing_price(parameters)
     elif price_base == "ListPrice":
         base_price = get_catalog_price(prod_fields)
     else:
@@ -67,19 +139,10 @@ def export_price(parameters):
     price = finalize_price(base_price * user_factor)
     return price
 
+@row_cached
 def export_min_price(parameters):
     def get_min_price_factor(ilugg_fields, purchasing_price):
-        factor_definition = ilugg_fields["MinPriceFormular"]
-        # IF ($EK<threshold) THEN ($EK*greater_factor) ELSE ($EK*smaller_factor)
-        split_character = " "
-        factor_definition_parts = factor_definition.replace("IF ($EK<", "")
-        factor_definition_parts = factor_definition_parts.replace(") THEN ($EK*", split_character)
-        factor_definition_parts = factor_definition_parts.replace(") ELSE ($EK*", split_character)
-        factor_definition_parts = factor_definition_parts.replace(")", "")
-        values = factor_definition_parts.split(split_character)
-        threshold = get_number(values[0])
-        greater_factor = get_number(values[1])
-        smaller_factor = get_number(values[2])
+        threshold, greater_factor, smaller_factor = get_price_tables(ilugg_fields).get_min_price_rule()
         if (purchasing_price < threshold):
             min_price_factor = greater_factor
         else:
@@ -88,7 +151,7 @@ def export_min_price(parameters):
 
     prod_fields = parameters["prod_fields"]
     ilugg_fields = parameters["ilugg_fields"]
-    purchasing_price = get_purchasing_price(prod_fields, ilugg_fields)
+    purchasing_price = get_row_purchasing_price(parameters)
     min_price_factor = get_min_price_factor(ilugg_fields, purchasing_price)
     min_price = finalize_price(purchasing_price * min_price_factor)
     return min_price
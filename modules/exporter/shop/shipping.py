@@ -1,3 +1,6 @@
+from .utils.row_memo import row_cached
+
+@row_cached
 def export_shipping(parameters):
     prod_fields = parameters["prod_fields"]
     if not "DELSTAT" in prod_fields:
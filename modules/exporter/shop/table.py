@@ -20,33 +20,45 @@ class Table():
     def __row(self, cells):
         return "<tr>{}</tr>".format("".join(cells))
 
-    def make_header(self, title):
+    def description_cell(self, description):
+        return self.__cell("kb-Tleft", description, trailing_space=True)
+
+    def value_cell(self, value):
+        return self.__cell("kb-Tright", value)
+
+    def __header_row(self, title):
         class_string = "kb-THeaderLeft"
-        header_row = self.__row([
+        return self.__row([
             self.__cell(class_string, title),
             self.__cell(class_string, "")
         ])
-        self.rows.append(header_row)
+
+    def __empty_row(self):
+        class_string = "kb-Tnull"
+        return self.__row([
+            self.__cell(class_string),
+            self.__cell(class_string)
+        ])
+
+    def header_rows(self, title):
+        # Leere Zeile und Überschrift, wie bei make_empty_row und make_header
+        return self.__empty_row() + self.__header_row(title)
+
+    def make_header(self, title):
+        self.rows.append(self.__header_row(title))
 
     def make_row(self, description, value):
-        description_cell = self.__cell("kb-Tleft", description, trailing_space=True)
-        value_cell = self.__cell("kb-Tright", value)
         row = self.__row([
-            description_cell,
-            value_cell
+            self.description_cell(description),
+            self.value_cell(value)
         ])
         self.rows.append(row)
         self.content_rows += 1
 
     def make_empty_row(self):
-        class_string = "kb-Tnull"
-        row = self.__row([
-            self.__cell(class_string),
-            self.__cell(class_string)
-        ])
-        self.rows.append(row)
+        self.rows.append(self.__empty_row())
 
-    def to_string(self):
+    def table_start(self):
         table_attributes = 'class="p_desc-table" '
         table_attributes += 'style="'
         table_attributes += "width: 90%;"
@@ -55,10 +67,38 @@ class Table():
         table_attributes += "font-family: sans-serif;"
         table_attributes += "-webkit-font-smoothing: antialiased;"
         table_attributes += '"'
+        return "<table {}><tbody>".format(table_attributes)
+
+    def table_end(self):
+        return "</tbody></table>"
 
+    def to_string(self):
         if self.content_rows > 0:
             rows = "".join(self.rows)
-            return "<table {}><tbody>{}</tbody></table>".format(
-                table_attributes,
-                rows
-            )
+            return self.table_start() + rows + self.table_end()
+
+class TableSkeleton():
+    # Tabelle, deren Überschriften und Beschreibungen schon fertig sind. Pro
+    # Produkt werden nur noch die Werte eingesetzt.
+    def __init__(self, tooltips, layout):
+        self.table = Table(tooltips)
+        self.value_ids = []
+        self.parts = [self.table.table_start()]
+        for field_id, type, name in layout:
+            if type == "HEAD":
+                self.parts[-1] += self.table.header_rows(name)
+            else:
+                self.parts[-1] += "<tr>" + self.table.description_cell(name)
+                self.value_ids.append(field_id)
+                self.parts.append("</tr>")
+        self.parts[-1] += self.table.table_end()
+
+    def to_string(self, get_value):
+        # Wie bei Table nur, wenn es mindestens eine Zeile mit Wert gibt
+        if not self.value_ids:
+            return None
+        html = [self.parts[0]]
+        for index, field_id in enumerate(self.value_ids):
+            html.append(self.table.value_cell(get_value(field_id)))
+            html.append(self.parts[index + 1])
+        return "".join(html)
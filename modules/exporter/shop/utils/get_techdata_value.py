@@ -1,4 +1,4 @@
-from modules.logger import Logger
+from modules.logger import Logger, WARN
 
 def get_value(fields, field_id, warn=False, prod_fields=None):
     prod_fields = prod_fields or fields
@@ -10,5 +10,5 @@ def get_value(fields, field_id, warn=False, prod_fields=None):
             warning_text += ": Kein Wert für das Feld '"
             warning_text += field_id
             warning_text += "'. Das Feld in der Tabelle bleibt leer."
-            Logger().log(warning_text)
+            Logger().log(warning_text, level=WARN)
         return ""
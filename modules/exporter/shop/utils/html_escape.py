@@ -1,8 +1,11 @@
-import html
 from modules.exporter.utils.escaped_characters import escaped_characters
+from modules.exporter.utils.translation import Translation
+
+# Entspricht html.escape und anschließendem Ersetzen der Sonderzeichen
+html_escape_translation = Translation(dict(
+    [("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")] +
+    list(escaped_characters.items())
+))
 
 def html_escape(text):
-    text = html.escape(text)
-    for character, escape_code in escaped_characters.items():
-        text = text.replace(character, escape_code)
-    return text
+    return html_escape_translation.translate(text)
@@ -1,26 +1,103 @@
 import re
 from .html_escape import html_escape
+from modules.config_caches import get_cache
 
-def include_tooltips(tooltips, text):
-    # Erstetze Begriffe im Text die durch Tooltips ergänzt werden sollen
-    # erst durch Platzhalter, damit Begriffe in Tooltips nicht ersetzt
-    # werden
-    tooltip_placeholders = {}
-
-    for tooltip_key, tooltip_value in tooltips.items():
-        tooltip_key = html_escape(tooltip_key)
-        if re.search(r'\b' + re.escape(tooltip_key) + r'\b', text):
+# Anzahl der Texte, deren Ergebnis pro Tooltip-Datei gemerkt wird
+MAX_CACHED_TEXTS = 4096
+
+class TooltipMatcher():
+    # Wird einmal pro Tooltip-Datei aufgebaut. Statt für jeden Begriff einen
+    # eigenen regulären Ausdruck zu suchen, werden mit einem gemeinsamen
+    # Ausdruck in einem Durchlauf alle Begriffe gefunden, die im Text
+    # vorkommen. Nur für diese wird die bisherige Ersetzung ausgeführt.
+    def __init__(self, tooltips):
+        self.tooltips = tooltips
+        self.entries = []
+        key_indices = {}
+        for tooltip_key, tooltip_value in tooltips.items():
+            tooltip_key = html_escape(tooltip_key)
             tooltip = '<span class="kb-tooltip" title="'
             tooltip += html_escape(tooltip_value)
             tooltip += '">'
             tooltip += tooltip_key
             tooltip += "</span>"
+            key_indices.setdefault(tooltip_key, []).append(len(self.entries))
+            self.entries.append((
+                tooltip_key,
+                re.compile(r'\b' + re.escape(tooltip_key) + r'\b'),
+                tooltip
+            ))
+
+        # Begriffe mit $ können auch über die Platzhalter hinweg passen, sie
+        # werden deshalb immer geprüft
+        self.always_checked = []
+        searchable_keys = []
+        for tooltip_key, indices in key_indices.items():
+            if tooltip_key == "" or "$" in tooltip_key:
+                self.always_checked += indices
+            else:
+                searchable_keys.append(tooltip_key)
+
+        # An jeder Stelle findet der Ausdruck den längsten Begriff, alle
+        # kürzeren Begriffe an derselben Stelle sind Anfänge davon
+        self.prefix_indices = {}
+        for tooltip_key in searchable_keys:
+            self.prefix_indices[tooltip_key] = [
+                index
+                for length in range(1, len(tooltip_key) + 1)
+                for index in key_indices.get(tooltip_key[:length], [])
+            ]
+        self.pattern = None
+        if searchable_keys:
+            searchable_keys.sort(key=len, reverse=True)
+            self.pattern = re.compile("(?=({}))".format(
+                "|".join(re.escape(tooltip_key) for tooltip_key in searchable_keys)
+            ))
+        self.results = {}
+
+    def matching_entries(self, text):
+        indices = set(self.always_checked)
+        if self.pattern != None:
+            for match in self.pattern.finditer(text):
+                indices.update(self.prefix_indices[match.group(1)])
+        return [self.entries[index] for index in sorted(indices)]
 
-            tooltip_placeholder = "$${}$$".format(tooltip_key)
-            tooltip_placeholders[tooltip_placeholder] = tooltip
-            text = text.replace(tooltip_key, tooltip_placeholder)
+    def include_tooltips(self, text):
+        if text in self.results:
+            return self.results[text]
+        result = self.__replace(text)
+        if len(self.results) >= MAX_CACHED_TEXTS:
+            self.results.clear()
+        self.results[text] = result
+        return result
 
-    for placeholder, tooltip in tooltip_placeholders.items():
-        text = text.replace(placeholder, tooltip)
+    def __replace(self, text):
+        # Erstetze Begriffe im Text die durch Tooltips ergänzt werden sollen
+        # erst durch Platzhalter, damit Begriffe in Tooltips nicht ersetzt
+        # werden
+        tooltip_placeholders = {}
 
-    return text
+        for tooltip_key, tooltip_pattern, tooltip in self.matching_entries(text):
+            if tooltip_pattern.search(text):
+                tooltip_placeholder = "$${}$$".format(tooltip_key)
+                tooltip_placeholders[tooltip_placeholder] = tooltip
+                text = text.replace(tooltip_key, tooltip_placeholder)
+
+        for placeholder, tooltip in tooltip_placeholders.items():
+            text = text.replace(placeholder, tooltip)
+
+        return text
+
+# Nur der Matcher der zuletzt verwendeten Tooltips wird gemerkt, neu
+# eingelesene Tooltips ersetzen ihn. Er liegt bei den Konfigurationen, beim
+# Neuladen wird der bisherige mit ihnen freigegeben.
+def get_tooltip_matcher(tooltips):
+    cache = get_cache("tooltip_matcher")
+    matcher = cache.get("matcher")
+    if matcher == None or matcher.tooltips is not tooltips:
+        matcher = TooltipMatcher(tooltips)
+        cache["matcher"] = matcher
+    return matcher
+
+def include_tooltips(tooltips, text):
+    return get_tooltip_matcher(tooltips).include_tooltips(text)
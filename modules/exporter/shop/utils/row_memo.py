@@ -0,0 +1,18 @@
+import functools
+
+def memoized(parameters, key, compute):
+    # Zwischenergebnisse werden pro Produkt in parameters["memo"] gemerkt
+    memo = parameters.get("memo")
+    if memo == None:
+        return compute()
+    if not key in memo:
+        memo[key] = compute()
+    return memo[key]
+
+def row_cached(special_case):
+    # Für Sonderfälle, die nur von Produkt und ILUGG abhängen (nicht von der
+    # Spezifikation), wird das Ergebnis einmal pro Produkt berechnet
+    @functools.wraps(special_case)
+    def cached_special_case(parameters):
+        return memoized(parameters, special_case, lambda: special_case(parameters))
+    return cached_special_case
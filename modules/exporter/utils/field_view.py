@@ -0,0 +1,72 @@
+from collections.abc import Mapping
+
+class FieldView(Mapping):
+    # Liest die Felder eines Produkts wie flatten_fields, ohne sie in ein
+    # neues Dictionary zu kopieren. Attribute (z.B. aus TECHDATA) und Felder
+    # überschreiben sich wie dort in der Reihenfolge der Datei, meistens
+    # verdecken also die Attribute gleichnamige Felder.
+    def __init__(self, fields):
+        self.fields = fields
+        self.attribute_fields = [
+            (field_name, field_value)
+            for field_name, field_value in fields.items()
+            if not isinstance(field_value, str)
+        ]
+        # Meistens gibt es nur TECHDATA mit Attributen
+        self.attributes = self.attribute_fields[0][1] if len(self.attribute_fields) == 1 else None
+        self.positions = None
+
+    def __position(self, field_name):
+        # Nur nötig, wenn ein Name als Feld und als Attribut vorkommt
+        if self.positions == None:
+            self.positions = {name: position for position, name in enumerate(self.fields)}
+        return self.positions[field_name]
+
+    def get(self, field_name, default=None):
+        # Eine Suche statt "in" und [], Werte sind nie None
+        field_value = self.fields.get(field_name)
+        if not isinstance(field_value, str):
+            field_value = None
+        attributes = self.attributes
+        if attributes != None:
+            attributes_name = self.attribute_fields[0][0]
+            if not field_name in attributes:
+                attributes = None
+        else:
+            # Das letzte Feld mit dem Attribut gilt
+            attributes_name = None
+            for name, field_attributes in reversed(self.attribute_fields):
+                if field_name in field_attributes:
+                    attributes_name, attributes = name, field_attributes
+                    break
+        if attributes == None:
+            return default if field_value == None else field_value
+        if field_value != None and self.__position(field_name) > self.__position(attributes_name):
+            return field_value
+        return attributes[field_name]
+
+    def __getitem__(self, field_name):
+        value = self.get(field_name)
+        if value == None:
+            raise KeyError(field_name)
+        return value
+
+    def __contains__(self, field_name):
+        if isinstance(self.fields.get(field_name), str):
+            return True
+        if self.attributes != None:
+            return field_name in self.attributes
+        return any(field_name in attributes for name, attributes in self.attribute_fields)
+
+    def __iter__(self):
+        # Selten gebraucht, die Namen werden dafür einmal zusammengestellt
+        field_names = {}
+        for field_name, field_value in self.fields.items():
+            if isinstance(field_value, str):
+                field_names[field_name] = None
+            else:
+                field_names.update(dict.fromkeys(field_value))
+        return iter(field_names)
+
+    def __len__(self):
+        return sum(1 for field_name in self)
@@ -1,9 +0,0 @@
-def flatten_fields(fields):
-    flattened_fields = {}
-    for field_name, field_value in fields.items():
-        if isinstance(field_value, str):
-            flattened_fields[field_name] = field_value
-        else:
-            for attribute_name, attribute_value in field_value.items():
-                flattened_fields[attribute_name] = attribute_value
-    return flattened_fields
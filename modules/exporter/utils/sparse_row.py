@@ -0,0 +1,17 @@
+def get_field_indices(field_names):
+    return {field_name: index for index, field_name in enumerate(field_names)}
+
+def sparse_row(fields, field_indices, get_value):
+    # Baut eine Zeile mit einer Spalte pro Eintrag in field_indices, dabei
+    # werden nur die Felder durchlaufen, die das Produkt hat. Die Werte
+    # werden in der Reihenfolge der Spalten berechnet, damit die Logs gleich
+    # bleiben.
+    row = [None] * len(field_indices)
+    present_fields = sorted(
+        (field_indices[field_name], field_name)
+        for field_name in fields
+        if field_name in field_indices
+    )
+    for index, field_name in present_fields:
+        row[index] = get_value(field_name, fields[field_name])
+    return row
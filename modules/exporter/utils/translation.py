@@ -0,0 +1,27 @@
+import re
+
+class Translation():
+    # Führt mehrere Ersetzungen in einem Durchlauf über den Text aus: ein
+    # gemeinsamer regulärer Ausdruck findet alle Begriffe, die Ersetzung
+    # kommt aus einer Tabelle. Zusätzliche Muster (regulärer Ausdruck,
+    # Ersetzung) werden vor den Begriffen geprüft.
+    def __init__(self, replacements, patterns=[]):
+        self.replacements = dict(replacements)
+        self.pattern_replacements = {}
+        alternatives = []
+        for index, (pattern, replacement) in enumerate(patterns):
+            group_name = "pattern{}".format(index)
+            self.pattern_replacements[group_name] = replacement
+            alternatives.append("(?P<{}>{})".format(group_name, pattern))
+        # Längere Begriffe zuerst, damit sie Vorrang vor ihren Anfängen haben
+        for key in sorted(self.replacements.keys(), key=len, reverse=True):
+            alternatives.append(re.escape(key))
+        self.pattern = re.compile("|".join(alternatives))
+
+    def __replacement(self, match):
+        if match.lastgroup != None:
+            return self.pattern_replacements[match.lastgroup]
+        return self.replacements[match.group(0)]
+
+    def translate(self, text):
+        return self.pattern.sub(self.__replacement, text)
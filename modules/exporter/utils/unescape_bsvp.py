@@ -1,22 +1,31 @@
 from .escaped_characters import escaped_characters
+from .translation import Translation
 
 def unescape_bsvp_to_html(text):
-    def replacement(character, html_escape_code):
-        return html_escape_code
-    return unescape(text, replacement)
+    return unescape(text, html_unescape)
 
 def unescape_bsvp_to_text(text):
-    def replacement(character, html_escape_code):
-        return character
-    return unescape(text, replacement)
+    return unescape(text, text_unescape)
 
-def unescape(text, replacement):
+def bsvp_unescape_translation(replacement):
+    replacements = {}
     for character, html_escape_code in escaped_characters.items():
         bsvp_escape_code = character + "&SM"
         other_bsvp_escape_code = html_escape_code.replace(";", "&SM")
-        text = text.replace(bsvp_escape_code, replacement(character, html_escape_code))
-        text = text.replace(other_bsvp_escape_code, replacement(character, html_escape_code))
-    text = text.replace("color&SEM", "color:")
-    text = text.replace("&EOL", "")
-    text = text.replace("&SM", "")
-    return text
+        replacements[bsvp_escape_code] = replacement(character, html_escape_code)
+        replacements[other_bsvp_escape_code] = replacement(character, html_escape_code)
+    replacements["color&SEM"] = "color:"
+    replacements["&EOL"] = ""
+    replacements["&SM"] = ""
+    # &EOL wird vor &SM entfernt, dadurch entstehende &SM werden ebenfalls
+    # entfernt
+    return Translation(replacements, [(r"&(?:&EOL)*S(?:&EOL)*M", "")])
+
+html_unescape = bsvp_unescape_translation(lambda character, html_escape_code: html_escape_code)
+text_unescape = bsvp_unescape_translation(lambda character, html_escape_code: character)
+
+def unescape(text, translation):
+    # Alle BSVP Escape-Codes kommen mit &
+    if not "&" in text:
+        return text
+    return translation.translate(text)
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
-import os, yaml
+import os, yaml, threading
 from collections import OrderedDict
 from modules.constants import CONFIGS_DIRECTORY, FORMATTING_CONFIG_FILE, FORMATTING_JSONLD_CONFIG_FILE
+from modules.logger import Logger
+from modules.config_caches import get_cache, clear_cache
+from modules.source_signatures import record_sources
 from .decimal_separator import decimal_separator
 from .range_from_zero import range_from_zero
-from .replacement import replacement
-from .grouping import grouping
+from .replacement import replacement, is_compilable_replacement, ExactReplacement, AffixReplacement
+from .grouping import grouping, is_compilable_grouping, Grouping
 
 formatters = {
     "punkt_zu_komma": decimal_separator,
@@ -14,10 +17,44 @@ formatters = {
     "gruppierungen": grouping
 }
 
+# Formatierungen werden erst bei der ersten Verwendung eingelesen und dann
+# zwischengespeichert, bis sie neu geladen werden
+def format_configs():
+    return get_cache("format_configs")
+
+def loaded_format_options():
+    return get_cache("format_options")
+
+# Damit gleichzeitige Exporte die Formatierungen nur einmal aufbauen
+format_options_lock = threading.Lock()
+
+def load_format_config(config_file=FORMATTING_CONFIG_FILE):
+    configs = format_configs()
+    if not config_file in configs:
+        config_path = os.path.join(CONFIGS_DIRECTORY, config_file)
+        record_sources([config_path])
+        with open(config_path, "r") as formatting_config_file:
+            configs[config_file] = yaml.load(formatting_config_file, Loader=yaml.FullLoader)
+    return configs[config_file]
+
+def load_format_options(config_file=FORMATTING_CONFIG_FILE):
+    options = loaded_format_options()
+    format_options = options.get(config_file)
+    if format_options != None:
+        return format_options
+    with format_options_lock:
+        if not config_file in options:
+            options[config_file] = get_format_options(config_file)
+        return options[config_file]
+
+def reload_format_options():
+    clear_cache("format_configs")
+    clear_cache("format_options")
+    format_cache.clear()
+
 def get_format_options(config_file=FORMATTING_CONFIG_FILE):
-    with open(os.path.join(CONFIGS_DIRECTORY, config_file), "r") as formatting_config_file:
-        format_config = yaml.load(formatting_config_file, Loader=yaml.FullLoader)
-    
+    format_config = load_format_config(config_file)
+
     # Formatierungen so umschreiben, dass sie durch die Feld ID erreichbar sind.
     # Für jedes Feld wird eine Liste von Formatierungen angegeben.
     # Wenn Reihenfolgen angegeben sind, werden diese Listen so sortiert, dass
@@ -72,15 +109,169 @@ def get_format_options(config_file=FORMATTING_CONFIG_FILE):
     if "reihenfolgen" in format_config:
         format_options = sort_format_options(format_config, format_options)
 
-    return(format_options)
+    return compile_format_options(format_options)
+
+class FormatOption():
+    # Nicht vorbereitete Formatierung, wird wie bisher mit ihren Parametern
+    # aufgerufen
+    def __init__(self, format_option):
+        self.format_option = format_option
+
+    def __call__(self, value):
+        return formatters[self.format_option["type"]](value, self.format_option)
+
+class FormatChain():
+    # Alle Formatierungen eines Feldes in der sortierten Reihenfolge
+    def __init__(self, steps):
+        self.steps = steps
+
+    def __call__(self, value):
+        for step in self.steps:
+            value = step(value)
+        return value
+
+def compile_format_options(format_options):
+    # Bereitet die Formatierungen jedes Feldes einmal vor: aufeinanderfolgende
+    # Ersetzungen ohne Option werden zu einer Tabelle zusammengefasst,
+    # startswith/endswith zu einem regulären Ausdruck und Gruppierungen
+    # suchen per Intervallhalbierung
+    compiled_format_options = {}
+    for field, field_options in format_options.items():
+        steps = []
+        exact_replacements = []
+        for format_option in field_options:
+            is_exact_replacement = format_option["type"] == "ersetzungen" \
+                and format_option["option"] not in ["startswith", "endswith"] \
+                and is_compilable_replacement(format_option)
+            # Nur Texte können von folgenden Ersetzungen weiter ersetzt werden
+            if exact_replacements and (not is_exact_replacement or not isinstance(exact_replacements[-1]["afterwards"], str)):
+                steps.append(ExactReplacement(exact_replacements))
+                exact_replacements = []
+            if is_exact_replacement:
+                exact_replacements.append(format_option)
+            elif format_option["type"] == "ersetzungen" and is_compilable_replacement(format_option):
+                steps.append(AffixReplacement(format_option))
+            elif format_option["type"] == "gruppierungen" and is_compilable_grouping(format_option):
+                steps.append(Grouping(format_option))
+            else:
+                steps.append(FormatOption(format_option))
+        if exact_replacements:
+            steps.append(ExactReplacement(exact_replacements))
+        compiled_format_options[field] = FormatChain(steps)
+    return compiled_format_options
 
-format_options = get_format_options()
-format_options_jsonld = get_format_options(FORMATTING_JSONLD_CONFIG_FILE)
+# Maximale Anzahl gemerkter Ergebnisse von format_field
+MAX_CACHED_VALUES = 65536
+
+class FormatCache():
+    # Merkt sich die zuletzt verwendeten Ergebnisse zusammen mit den dabei
+    # geschriebenen Logs, damit diese bei jedem Aufruf gleich bleiben
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry == None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats_text(self):
+        calls = self.hits + self.misses
+        if calls == 0:
+            return None
+        return "Formatierungen: {} Treffer, {} berechnet ({:.1f}% Treffer)".format(
+            self.hits,
+            self.misses,
+            100.0 * self.hits / calls
+        )
+
+# Gemeinsam für alle Formatierungen, der Schlüssel enthält die verwendeten
+# Formatierungen. Die Einträge halten die Formatierungen fest, damit deren id
+# nicht von neu geladenen Formatierungen wiederverwendet wird.
+format_cache = FormatCache(MAX_CACHED_VALUES)
 
 def format_field(value, field_name, options=None):
     if options is None:
-        options = format_options
-    if field_name in options:
-        for format_option in options[field_name]:
-            value = formatters[format_option["type"]](value, format_option)
-    return value
\ No newline at end of file
+        options = load_format_options()
+    if not field_name in options:
+        return value
+    if not isinstance(value, str):
+        return options[field_name](value)
+
+    result, log_lines = cached_format(options, field_name, value)
+    Logger().replay(log_lines)
+    return result
+
+def cached_format(options, field_name, value):
+    # Gibt (Ergebnis, Logs) aus format_cache zurück und formatiert den Wert
+    # nur, wenn er dort fehlt
+    cache_key = (id(options), field_name, value)
+    entry = format_cache.get(cache_key)
+    if entry == None:
+        logger = Logger()
+        log_lines = []
+        try:
+            with logger.captured() as log_lines:
+                result = options[field_name](value)
+        except Exception:
+            logger.replay(log_lines)
+            raise
+        entry = (result, tuple(log_lines), options)
+        format_cache.put(cache_key, entry)
+    result, log_lines, entry_options = entry
+    return result, log_lines
+
+
+def format_column(values, field_name, options=None):
+    # Formatiert alle Werte einer Spalte über format_cache, mit einer Abfrage
+    # pro unterschiedlichem Wert. Gibt für jeden Wert (Ergebnis, Logs) zurück,
+    # die Logs werden erst bei der Verwendung des Wertes mit Logger.replay
+    # geschrieben.
+    if options is None:
+        options = load_format_options()
+    if not field_name in options:
+        return [(value, ()) for value in values]
+
+    entries = {}
+    for value in values:
+        if isinstance(value, str) and not value in entries:
+            entries[value] = cached_format(options, field_name, value)
+
+    logger = Logger()
+    column = []
+    for value in values:
+        if isinstance(value, str):
+            column.append(entries[value])
+            continue
+        log_lines = []
+        try:
+            with logger.captured() as log_lines:
+                result = options[field_name](value)
+        except Exception:
+            logger.replay(log_lines)
+            raise
+        column.append((result, tuple(log_lines)))
+    return column
@@ -1,4 +1,5 @@
-from modules.logger import Logger
+from bisect import bisect_left
+from modules.logger import Logger, WARN
 
 logger = Logger()
 
@@ -23,5 +24,44 @@ def grouping(value, format_option):
         unit = format_option["unit"]
         return "{} {}{}".format(indicator, str(matching_threshold).zfill(digits), unit)
     except:
-        logger.log("Der Wert '{}' kann nicht gruppiert werden, da er nicht numerisch ist.".format(value))
-        return value
\ No newline at end of file
+        logger.log("Der Wert '{}' kann nicht gruppiert werden, da er nicht numerisch ist.", value, level=WARN)
+        return value
+
+def is_compilable_grouping(format_option):
+    # Nur aufsteigend sortierte Zahlen als Grenzwerte können halbiert werden
+    thresholds = format_option["thresholds"]
+    if not isinstance(thresholds, list) or len(thresholds) == 0:
+        return False
+    for threshold in thresholds:
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold != threshold:
+            return False
+    return all(lower <= upper for lower, upper in zip(thresholds, thresholds[1:]))
+
+class Grouping():
+    # Größter Grenzwert und Stellen werden einmal berechnet, der passende
+    # Grenzwert per Intervallhalbierung gesucht
+    def __init__(self, format_option):
+        self.thresholds = list(format_option["thresholds"])
+        self.largest_threshold = max(self.thresholds)
+        self.digits = len(str(self.largest_threshold))
+        self.unit = format_option["unit"]
+
+    def __call__(self, value):
+        try:
+            numeric_value = float(value.replace(",", "."))
+            index = len(self.thresholds)
+            # NaN ist mit keinem Grenzwert vergleichbar
+            if numeric_value == numeric_value:
+                index = bisect_left(self.thresholds, numeric_value)
+
+            if index < len(self.thresholds):
+                indicator = "bis"
+                matching_threshold = self.thresholds[index]
+            else:
+                indicator = "über"
+                matching_threshold = self.largest_threshold
+
+            return "{} {}{}".format(indicator, str(matching_threshold).zfill(self.digits), self.unit)
+        except:
+            logger.log("Der Wert '{}' kann nicht gruppiert werden, da er nicht numerisch ist.", value, level=WARN)
+            return value
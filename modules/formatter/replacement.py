@@ -1,3 +1,5 @@
+import re
+
 def replacement(value, format_option):
     before_values = format_option["before"]
     afterwards_value = format_option["afterwards"]
@@ -19,4 +21,58 @@ def replacement(value, format_option):
         ))
         if value.lower() in lower_before_values:
             value = afterwards_value
-    return value
\ No newline at end of file
+    return value
+
+def is_compilable_replacement(format_option):
+    before_values = format_option["before"]
+    return isinstance(before_values, list) and all(isinstance(before_value, str) for before_value in before_values)
+
+class ExactReplacement():
+    # Mehrere aufeinanderfolgende Ersetzungen ohne Option als eine Tabelle:
+    # für jeden Wert (klein geschrieben) steht das Ergebnis nach allen
+    # Ersetzungen schon fest
+    def __init__(self, format_options):
+        self.results = {}
+        for index, format_option in enumerate(format_options):
+            for before_value in format_option["before"]:
+                lower_before_value = before_value.lower()
+                if lower_before_value in self.results:
+                    continue
+                value = format_option["afterwards"]
+                for following_option in format_options[index + 1:]:
+                    value = replacement(value, following_option)
+                self.results[lower_before_value] = value
+
+    def __call__(self, value):
+        return self.results.get(value.lower(), value)
+
+class AffixReplacement():
+    # Ersetzung mit Option startswith oder endswith. Der reguläre Ausdruck
+    # prüft die Begriffe in der angegebenen Reihenfolge, für endswith wird
+    # der Wert rückwärts durchsucht.
+    def __init__(self, format_option):
+        self.format_option = format_option
+        self.afterwards_value = format_option["afterwards"]
+        self.reverse = format_option["option"] == "endswith"
+        before_values = format_option["before"]
+        if self.reverse:
+            before_values = [before_value[::-1] for before_value in before_values]
+        self.pattern = None
+        if before_values:
+            self.pattern = re.compile("|".join(re.escape(before_value) for before_value in before_values))
+
+    def __call__(self, value):
+        if self.pattern == None:
+            return value
+        if not isinstance(value, str):
+            return replacement(value, self.format_option)
+        if self.reverse:
+            match = self.pattern.match(value[::-1])
+        else:
+            match = self.pattern.match(value)
+        if match == None:
+            return value
+        before_value = match.group(0)
+        if self.reverse:
+            before_value = before_value[::-1]
+        return value.replace(before_value, self.afterwards_value)
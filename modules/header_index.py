@@ -0,0 +1,87 @@
+import os
+import json
+import threading
+from modules.constants import CACHE_DIRECTORY, HEADER_INDEX_FILE, TECHDATA, ARTICLE_NUMBER
+from modules.parser.prod import parse_product
+from modules.watcher import stat_signature
+
+# Wird erhöht, wenn sich der Aufbau des Index ändert
+HEADER_INDEX_VERSION = 2
+
+# Der Index wird vom Komplett-Exporter und der Vorschau aktualisiert
+index_lock = threading.Lock()
+
+def header_index_path():
+    return os.path.join(CACHE_DIRECTORY, HEADER_INDEX_FILE)
+
+def load_header_index():
+    try:
+        with open(header_index_path(), "r", encoding="utf-8") as index_file:
+            header_index = json.load(index_file)
+    except (OSError, ValueError):
+        return {}
+    if header_index.get("version") != HEADER_INDEX_VERSION:
+        return {}
+    return header_index["products"]
+
+def save_header_index(products):
+    os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+    index_path = header_index_path()
+    temporary_path = index_path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as index_file:
+        json.dump({ "version": HEADER_INDEX_VERSION, "products": products }, index_file, ensure_ascii=False)
+    os.replace(temporary_path, index_path)
+
+def index_product(product_path):
+    fields, attribute_names, attribute_types, error_code = parse_product(product_path)
+    if error_code != None:
+        return [], [], None
+    techdata_fields = []
+    if TECHDATA in fields and isinstance(fields[TECHDATA], dict):
+        techdata_fields = list(fields[TECHDATA].keys())
+    return list(fields.keys()), techdata_fields, fields.get(ARTICLE_NUMBER)
+
+def update_header_index(manufacturers):
+    # Merkt sich pro Produkt, welche Felder es enthält. Nur Produkte, deren
+    # Datei sich seit dem letzten Lauf geändert hat, werden neu eingelesen.
+    with index_lock:
+        return _update_header_index(manufacturers)
+
+def _update_header_index(manufacturers):
+    old_products = load_header_index()
+    products = {}
+    changed = False
+    for manufacturer_name, manufacturer in manufacturers.items():
+        for product_name, product_path in manufacturer["products"].items():
+            signature = stat_signature(product_path)
+            if signature == None:
+                continue
+            signature = list(signature)
+            old_product = old_products.get(product_path)
+            if old_product != None and old_product["signature"] == signature:
+                products[product_path] = old_product
+                continue
+            general_fields, techdata_fields, article_number = index_product(product_path)
+            products[product_path] = {
+                "signature": signature,
+                "general": general_fields,
+                "techdata": techdata_fields,
+                "artnr": article_number
+            }
+            changed = True
+
+    if changed or len(products) != len(old_products):
+        save_header_index(products)
+    return products
+
+def build_article_number_index(manufacturers):
+    # Ordnet jeder Artikelnummer Hersteller und Pfad des Produkts zu
+    product_manufacturers = {}
+    for manufacturer_name, manufacturer in manufacturers.items():
+        for product_path in manufacturer["products"].values():
+            product_manufacturers[product_path] = manufacturer_name
+    article_numbers = {}
+    for product_path, product in update_header_index(manufacturers).items():
+        if product["artnr"] != None:
+            article_numbers[product["artnr"]] = (product_manufacturers[product_path], product_path)
+    return article_numbers
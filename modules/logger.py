@@ -1,8 +1,94 @@
+import atexit
 import json
 import os
+import queue
 import time
+import threading
+import traceback
+from contextlib import contextmanager
 from modules.constants import LOG_DIRECTORY, GENERAL_CONFIG_FILE, KEEP_LOGS
 
+# Log Level, Einträge unterhalb des eingestellten Levels werden weder
+# formatiert noch geschrieben. SKIP sind übersprungene Produkte und der
+# Ablauf des Exports, sie werden immer geschrieben.
+DEBUG = 10
+INFO = 20
+WARN = 30
+SKIP = 40
+
+LOG_LEVELS = {
+    "DEBUG": DEBUG,
+    "INFO": INFO,
+    "WARN": WARN,
+    "SKIP": SKIP
+}
+
+def get_log_level(level_name):
+    # Unbekannte oder fehlende Angaben schreiben wie bisher alles
+    return LOG_LEVELS.get(str(level_name).upper(), DEBUG)
+
+# Sekunden ohne neue Einträge, nach denen gepufferte Einträge in die Datei
+# geschrieben werden
+FLUSH_INTERVAL = 0.5
+
+class LogWriter():
+    # Schreibt die Einträge in einem eigenen Thread über eine geöffnete,
+    # gepufferte Datei, statt die Datei für jeden Eintrag zu öffnen.
+    # Aufträge werden der Reihe nach über die Queue abgearbeitet.
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.log_file = None
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def open(self, path):
+        self.queue.put(("open", path))
+
+    def write(self, text):
+        self.queue.put(("write", text))
+
+    def flush(self, timeout=None):
+        # Wartet, bis alle bisherigen Einträge in der Datei stehen
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        done.wait(timeout)
+
+    def close(self, timeout=None):
+        done = threading.Event()
+        self.queue.put(("close", done))
+        done.wait(timeout)
+
+    def __close_file(self):
+        if self.log_file != None:
+            self.log_file.close()
+            self.log_file = None
+
+    def __run(self):
+        while True:
+            try:
+                command, value = self.queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                # Keine neuen Einträge, Puffer schreiben, damit bei einem
+                # Absturz möglichst wenig verloren geht
+                command, value = "flush", None
+            try:
+                if command == "write":
+                    if self.log_file != None:
+                        self.log_file.write(value + "\n")
+                elif command == "open":
+                    self.__close_file()
+                    self.log_file = open(value, "a")
+                elif command == "flush":
+                    if self.log_file != None:
+                        self.log_file.flush()
+                elif command == "close":
+                    self.__close_file()
+            except Exception:
+                print(traceback.format_exc(), flush=True)
+            finally:
+                if isinstance(value, threading.Event):
+                    value.set()
+
 class Logger():
     logger = None
     def __init__(self):
@@ -15,6 +101,13 @@ class Logger():
     class __Logger():
         log_ending = ".log"
 
+        def __init__(self):
+            self.thread_state = threading.local()
+            self.level = DEBUG
+            self.writer = LogWriter()
+            # Beim Beenden noch offene Einträge schreiben
+            atexit.register(self.writer.close, 5)
+
         def __log_path(self, exporter_id):
             timestamp = time.strftime("%Y%m%dT%H%M%S", time.localtime())
             return "{}/{}_{}{}".format(LOG_DIRECTORY, timestamp, exporter_id, self.log_ending)
@@ -38,10 +131,62 @@ class Logger():
             return log_path
 
         def set_path(self, exporter_id):
+            # Die bisherige Datei wird geschlossen, bevor alte Logs gelöscht
+            # werden
+            self.writer.close()
             self.log_path = self.__log_path(exporter_id)
             open(self.log_path, "w").close()
             self.__delete_old(exporter_id)
+            self.writer.open(self.log_path)
+
+        def flush(self):
+            self.writer.flush()
+
+        def set_level(self, level):
+            self.level = level
+
+        def is_enabled(self, level):
+            # Für Logs, deren Inhalt aufwendig aufgebaut wird, auch beim
+            # Sammeln gilt das eingestellte Level
+            return level >= self.level and not getattr(self.thread_state, "muted", False)
+
+        @contextmanager
+        def muted(self):
+            # Unterdrückt Logs im aktuellen Thread, z.B. für die Vorschau
+            # während ein Export in das Log schreibt
+            self.thread_state.muted = True
+            try:
+                yield
+            finally:
+                self.thread_state.muted = False
+
+        @contextmanager
+        def captured(self):
+            # Sammelt Logs im aktuellen Thread als (Text, Argumente, Level) in
+            # einer Liste, statt sie zu schreiben. Mit replay werden sie später
+            # formatiert und geschrieben.
+            previous_lines = getattr(self.thread_state, "captured_lines", None)
+            self.thread_state.captured_lines = []
+            try:
+                yield self.thread_state.captured_lines
+            finally:
+                self.thread_state.captured_lines = previous_lines
+
+        def replay(self, log_lines):
+            for text, args, level in log_lines:
+                self.log(text, *args, level=level)
 
-        def log(self, text):
-            with open(self.log_path, "a") as log_file:
-                log_file.write(text + "\n")
+        def log(self, text, *args, level=INFO):
+            # Mit args wird der Text erst formatiert, wenn er geschrieben wird.
+            # Gesammelte Logs werden unabhängig vom Level gemerkt, sie können
+            # (z.B. aus dem Cache der Formatierungen) später bei einem anderen
+            # Level geschrieben werden.
+            captured_lines = getattr(self.thread_state, "captured_lines", None)
+            if captured_lines != None:
+                captured_lines.append((text, args, level))
+                return
+            if level < self.level or getattr(self.thread_state, "muted", False):
+                return
+            if args:
+                text = text.format(*args)
+            self.writer.write(text)
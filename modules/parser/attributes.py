@@ -1,4 +1,6 @@
 from modules.constants import ATTRIBUTES_PATH
+from modules.config_caches import get_cache, clear_cache
+from modules.source_signatures import record_sources
 
 FIELD_SPARATOR = "§+§"
 
@@ -16,3 +18,17 @@ def parse_attributes():
                 continue
             attributes[attribute_id] = attribute_name
         return attributes
+
+# Eingelesene Attribute, bis sie neu geladen werden
+def loaded_attributes():
+    return get_cache("attributes")
+
+def load_attributes():
+    attributes = loaded_attributes()
+    if not ATTRIBUTES_PATH in attributes:
+        record_sources([ATTRIBUTES_PATH])
+        attributes[ATTRIBUTES_PATH] = parse_attributes()
+    return attributes[ATTRIBUTES_PATH]
+
+def reload_attributes():
+    clear_cache("attributes")
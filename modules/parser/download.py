@@ -1,6 +1,6 @@
 import json
 import os
-from modules.logger import Logger
+from modules.logger import Logger, WARN
 from modules.constants import GENERAL_CONFIG_FILE
 
 def build_download_path(path):
@@ -28,7 +28,7 @@ def parse_download(download_content, download_field = None, article = None):
         else:
             warning_text += "({})".format(download_content)
         warning_text += ". Der Download wird übersprungen."
-        Logger().log(warning_text)
+        Logger().log(warning_text, level=WARN)
         return None
 
     return {
@@ -1,26 +1,34 @@
 import os
 import yaml
 from modules.constants import CONFIGS_DIRECTORY
+from modules.config_caches import get_cache
+from modules.source_signatures import record_sources
 
-gpsr_configs = {}
+def gpsr_cache():
+    # Eingelesene Konfigurationen ("configs") und die Engine dazu ("engine")
+    return get_cache("gpsr")
 
 def gpsr_load_configs():
-    global gpsr_configs
-    gpsr_configs = []
+    # Erst vollständig einlesen und dann austauschen, damit nie eine halb
+    # gefüllte Liste sichtbar ist
+    configs = []
     gpsr_dir = os.path.join(CONFIGS_DIRECTORY, "GPSR")
     if os.path.exists(gpsr_dir):
+        record_sources([gpsr_dir])
         for filename in os.listdir(gpsr_dir):
             if filename.endswith(".yml") and not os.path.isdir(os.path.join(gpsr_dir, filename)):
+                record_sources([os.path.join(gpsr_dir, filename)])
                 with open(os.path.join(gpsr_dir, filename), "r") as file:
                     config = yaml.safe_load(file)
-                    gpsr_configs.append(config)
-    return gpsr_configs
+                    configs.append(config)
+    gpsr_cache()["configs"] = configs
+    return configs
 
 def gpsr_get_configs():
-    global gpsr_configs
-    if not gpsr_configs:
-        gpsr_load_configs()
-    return gpsr_configs
+    configs = gpsr_cache().get("configs")
+    if not configs:
+        configs = gpsr_load_configs()
+    return configs
 
 def gpsr_load_template(template_name):
     template_path = os.path.join(CONFIGS_DIRECTORY, "GPSR", "Templates", template_name + ".txt")
@@ -29,10 +37,84 @@ def gpsr_load_template(template_name):
             return file.read()
     return ""
 
-def gpsr_process_template(template_name, template_data):
-    template_content = gpsr_load_template(template_name)
+def gpsr_fill_template(template_content, template_data):
     html_content = template_content
     for key, value in template_data.items():
         placeholder = "{" + key + "}"
         html_content = html_content.replace(placeholder, value)
     return html_content
+
+def gpsr_process_template(template_name, template_data):
+    return gpsr_fill_template(gpsr_load_template(template_name), template_data)
+
+# Maximale Anzahl gemerkter Ergebnisse pro Kombination von Feldwerten
+MAX_CACHED_RESULTS = 4096
+
+class GpsrEngine():
+    # Wird einmal pro eingelesener Konfiguration aufgebaut: Konfigurationen
+    # nach Priorität sortiert, Bedingungen nach Feld und Wert indiziert und
+    # Vorlagen im Speicher. Das Ergebnis hängt nur von den Werten der Felder
+    # in den Bedingungen ab und wird pro Kombination gemerkt.
+    def __init__(self, configs):
+        self.configs = configs
+        # Higher priority overwrites templates with lower priority
+        sorted_configs = sorted(configs, key=lambda config: config.get("Priority", 0))
+        self.templates = []
+        self.condition_counts = []
+        self.condition_index = {}
+        self.condition_fields = []
+        template_contents = {}
+        for config_index, config in enumerate(sorted_configs):
+            conditions = config.get("Conditions", {})
+            for field, value in conditions.items():
+                if not field in self.condition_fields:
+                    self.condition_fields.append(field)
+                self.condition_index.setdefault((field, str(value).lower()), []).append(config_index)
+            self.condition_counts.append(len(conditions))
+            config_templates = []
+            for name, data in config.get("Templates", {}).items():
+                if not name in template_contents:
+                    template_contents[name] = gpsr_load_template(name)
+                config_templates.append((name, template_contents[name], data))
+            self.templates.append(config_templates)
+        self.results = {}
+
+    def matching_configs(self, field_values):
+        condition_matches = [0] * len(self.condition_counts)
+        for field, field_value in zip(self.condition_fields, field_values):
+            for config_index in self.condition_index.get((field, field_value), []):
+                condition_matches[config_index] += 1
+        return [
+            config_index
+            for config_index, condition_count in enumerate(self.condition_counts)
+            if condition_matches[config_index] == condition_count
+        ]
+
+    def render_templates(self, tech_data):
+        # Gibt die ausgefüllten Vorlagen nach Namen zurück
+        field_values = tuple(
+            str(tech_data.get(field, "")).lower()
+            for field in self.condition_fields
+        )
+        if field_values in self.results:
+            return self.results[field_values]
+
+        result = {}
+        for config_index in self.matching_configs(field_values):
+            for name, template_content, data in self.templates[config_index]:
+                result[name] = gpsr_fill_template(template_content, data)
+        if len(self.results) >= MAX_CACHED_RESULTS:
+            self.results.clear()
+        self.results[field_values] = result
+        return result
+
+def gpsr_get_engine():
+    # Neu eingelesene Konfigurationen bekommen eine neue Engine, die
+    # Vorlagen werden dabei ebenfalls neu eingelesen
+    configs = gpsr_get_configs()
+    cache = gpsr_cache()
+    engine = cache.get("engine")
+    if engine == None or engine.configs is not configs:
+        engine = GpsrEngine(configs)
+        cache["engine"] = engine
+    return engine
@@ -1,9 +1,133 @@
 import os, sys, html, re
 from collections import OrderedDict
+from modules.constants import TECHDATA, PRODUCT_TYPE_ID
 
 DATA_SEPARTOR = "§+§"
 ATTRIBUTE_SEPARATOR = "§-§"
 
+def parse_attribute(attribute):
+    # Gibt ID, Typ, Name und Wert eines Attributs zurück, soweit sie
+    # vorhanden sind. Leere Werte werden nicht übernommen.
+    attribute_type, attribute_name, attribute_value = None, None, None
+    attribute = attribute.split("@")
+    if len(attribute) != 2:
+        return None, None, None, None
+    try:
+        attribute_id = re.search(r"\[\[.*\.(.+?)\]\]", attribute[1]).group(1)
+    except AttributeError:
+        return None, None, None, None
+    try:
+        attribute_parts = attribute[0].split("::")
+        attribute_type = attribute_parts[0]
+        attribute_name = html.unescape(attribute_parts[1]).strip()
+        attribute_value = html.unescape(attribute_parts[2]).strip()
+        if attribute_value == "":
+            attribute_value = None
+    except IndexError:
+        pass
+    return attribute_id, attribute_type, attribute_name, attribute_value
+
+def read_product_data(product_path):
+    with open(product_path, "r",  encoding="utf-8") as bsvp_file:
+        return "".join(line.strip() for line in bsvp_file.readlines())
+
+def scan_product(product_path):
+    # Liest nur die Feldnamen und den Produkttyp eines Produkts, ohne alle
+    # Felder und Attribute zu verarbeiten. Wenn der Produkttyp so nicht
+    # eindeutig bestimmt werden kann, wird None zurückgegeben und das Produkt
+    # muss normal eingelesen werden.
+    try:
+        product_data = read_product_data(product_path)
+    except UnicodeDecodeError:
+        return None
+
+    field_names = set()
+    techdata_values = []
+    for field in product_data.split(DATA_SEPARTOR):
+        field_parts = field.split("=", 1)
+        if len(field_parts) == 1:
+            continue
+        field_name = field_parts[0]
+        field_names.add(field_name)
+        if field_name == TECHDATA:
+            techdata_values.append(field_parts[1])
+        elif PRODUCT_TYPE_ID in field:
+            # Der Produkttyp könnte auch aus einem anderen Feld kommen
+            return None
+
+    if len(techdata_values) != 1:
+        return None
+    field_attributes = html.unescape(techdata_values[0]).strip().split(ATTRIBUTE_SEPARATOR)
+    if len(field_attributes) < 2:
+        return None
+
+    # Wie beim Einlesen gilt der letzte Wert
+    product_type = None
+    for attribute in field_attributes:
+        if PRODUCT_TYPE_ID in attribute:
+            attribute_id, attribute_type, attribute_name, attribute_value = parse_attribute(attribute)
+            if attribute_id == PRODUCT_TYPE_ID and attribute_value != None:
+                product_type = attribute_value
+    if product_type == None:
+        return None
+
+    return {
+        "field_names": field_names,
+        "product_type": product_type
+    }
+
+def scan_fields(product_path, field_ids):
+    # Liest die Werte der angegebenen Felder so, wie sie nach parse_product
+    # im FieldView vorliegen würden, sowie die Namen aller Felder. Von
+    # den Attributen werden nur die verarbeitet, die eines der Felder
+    # enthalten können. Gibt None zurück, wenn die Datei nicht gelesen werden
+    # kann.
+    try:
+        product_data = read_product_data(product_path)
+    except UnicodeDecodeError:
+        return None
+
+    raw_fields = {}
+    for field in product_data.split(DATA_SEPARTOR):
+        field_parts = field.split("=", 1)
+        if len(field_parts) == 1:
+            continue
+        raw_fields[field_parts[0]] = field_parts[1]
+
+    values = {}
+    for field_name, raw_value in raw_fields.items():
+        # Ein § kann beim Dekodieren nur aus &sect oder &#... entstehen,
+        # andere Felder ohne Attribute müssen nicht dekodiert werden
+        may_have_attributes = ATTRIBUTE_SEPARATOR in raw_value or "&sect" in raw_value or "&#" in raw_value
+        if not may_have_attributes and not field_name in field_ids:
+            continue
+        field_value = html.unescape(raw_value).strip()
+        if ATTRIBUTE_SEPARATOR in field_value:
+            # Nur die Attribute an den Fundstellen der Felder werden
+            # verarbeitet, in der Reihenfolge der Datei
+            attribute_starts = set()
+            for field_id in field_ids:
+                position = field_value.find(field_id)
+                while position != -1:
+                    attribute_starts.add(field_value.rfind(ATTRIBUTE_SEPARATOR, 0, position))
+                    position = field_value.find(field_id, position + 1)
+            for attribute_start in sorted(attribute_starts):
+                attribute_start = 0 if attribute_start == -1 else attribute_start + len(ATTRIBUTE_SEPARATOR)
+                attribute_end = field_value.find(ATTRIBUTE_SEPARATOR, attribute_start)
+                if attribute_end == -1:
+                    attribute_end = len(field_value)
+                attribute = field_value[attribute_start:attribute_end]
+                attribute_id, attribute_type, attribute_name, attribute_value = parse_attribute(attribute)
+                if attribute_id in field_ids and attribute_value != None:
+                    values[attribute_id] = attribute_value
+        elif field_name in field_ids:
+            values[field_name] = field_value
+
+    return {
+        "field_names": set(raw_fields.keys()),
+        "values": values
+    }
+
 def parse_product(product_path):
     bsvp_file = open(product_path, "r",  encoding="utf-8")
     try:
@@ -33,25 +157,13 @@ def parse_product(product_path):
         if len(field_attributes) > 1:
             attributes = {}
             for attribute in field_attributes:
-                attribute = attribute.split("@")
-                if len(attribute) != 2:
-                    continue
-                try:
-                    attribute_id = re.search(r"\[\[.*\.(.+?)\]\]", attribute[1]).group(1)
-                except AttributeError:
-                    continue
-                try:
-                    attribute_parts = attribute[0].split("::")
-                    attribute_type = attribute_parts[0]
+                attribute_id, attribute_type, attribute_name, attribute_value = parse_attribute(attribute)
+                if attribute_type != None:
                     attribute_types[attribute_id] = attribute_type
-                    attribute_name = html.unescape(attribute_parts[1]).strip()
+                if attribute_name != None:
                     attribute_names[attribute_id] = attribute_name
-                    attribute_value = html.unescape(attribute_parts[2]).strip()
-                    if attribute_value == "":
-                        continue
-                except IndexError:
-                    continue
-                attributes[attribute_id] = attribute_value
+                if attribute_value != None:
+                    attributes[attribute_id] = attribute_value
             fields[field_name] = attributes
         else:
             fields[field_name] = field_value
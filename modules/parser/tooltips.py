@@ -1,4 +1,6 @@
 import os, sys
+from modules.config_caches import get_cache, clear_cache
+from modules.source_signatures import record_sources
 
 DATA_SEPARTOR = ";"
 
@@ -20,3 +22,17 @@ def parse_tooltips(tooltip_path):
             fields[tooltip_key] = tooltip_value
 
     return fields
+
+# Eingelesene Tooltips pro Datei, bis sie neu geladen werden
+def loaded_tooltips():
+    return get_cache("tooltips")
+
+def load_tooltips(tooltip_path):
+    tooltips = loaded_tooltips()
+    if not tooltip_path in tooltips:
+        record_sources([tooltip_path])
+        tooltips[tooltip_path] = parse_tooltips(tooltip_path)
+    return tooltips[tooltip_path]
+
+def reload_tooltips():
+    clear_cache("tooltips")
@@ -4,6 +4,7 @@ import json
 import logging
 import math
 import time
+import threading
 from datetime import datetime
 from pytz import utc
 from collections import OrderedDict
@@ -13,8 +14,11 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from modules.constants import GENERAL_CONFIG_FILE, MANUFACTURER_ENDING, \
     MANUFACTURER_INFO_ENDING, PRODUCT_ENDING, \
     CONFIGURATOR_NAME, GAMBIO_NAME, SHOP_NAME, SHOP_JSONLD_NAME, PRICE_NAME, COMPLETE_NAME, \
-    DATA_DIRECTORY, CUSTOM_NAME
-from modules.parser.gpsr import gpsr_load_configs
+    DATA_DIRECTORY, CUSTOM_NAME, FORMATTING_CONFIG_FILE, FORMATTING_JSONLD_CONFIG_FILE
+from modules.parser.gpsr import gpsr_load_configs, gpsr_get_configs
+from modules.formatter import load_format_options, format_cache
+from modules.config_caches import building_caches, swap_caches
+from modules.snapshot import save_snapshot, take_restored_manufacturers, manufacturer_source_signatures
 
 from modules.parser.prod import parse_product
 from modules.parser.ilugg import parse_manufacturer_information
@@ -25,10 +29,14 @@ from modules.exporter.shop import ShopExporter
 from modules.exporter.shop_jsonld import ShopJsonLDExporter
 from modules.exporter.price import PriceExporter
 from modules.exporter.custom import CustomExporter
-from modules.logger import Logger
+from modules.exporter.base_exporter import exporter_last_export_date
+from modules.validator import validate_format_configs
+from modules.logger import Logger, INFO, SKIP, get_log_level
+from modules.watcher import take_snapshot, compare_snapshots, stat_signature
+from modules.header_index import build_article_number_index
 
 def write_skip_log(logger, file, error):
-    logger.log(file + ": " + error)
+    logger.log(file + ": " + error, level=SKIP)
 
 
 def parse_manufacturers():
@@ -71,74 +79,132 @@ def get_manufacturer_information(manufacturer_path, manufacturer_name):
 def get_time():
     return time.strftime("%H:%M:%S", time.localtime())
 
-class Runner:
-    def setup(self):
-        self.manufacturers = parse_manufacturers()
-        with open(GENERAL_CONFIG_FILE, "r", encoding="utf-8") as config_file:
-            config = json.load(config_file)
-            self.max_products_per_file = config["max-articles-per-file"]
-
-        gpsr_load_configs()
-
-        self.exporters = {
-            "configurator": {
-                "module": ConfiguratorExporter(self.manufacturers),
-                "scheduled": False,
-                "running": False,
-                "stopping": False,
-                "log": [],
-                "name": CONFIGURATOR_NAME
-            },
-            "gambio": {
-                "module": GambioExporter(self.manufacturers),
-                "scheduled": False,
-                "running": False,
-                "stopping": False,
-                "log": [],
-                "name": GAMBIO_NAME
-            },
-            "shop": {
-                "module": ShopExporter(self.manufacturers),
-                "scheduled": False,
-                "running": False,
-                "stopping": False,
-                "log": [],
-                "name": SHOP_NAME
-            },
-            "shop_jsonld": {
-                "module": ShopJsonLDExporter(self.manufacturers),
-                "scheduled": False,
-                "running": False,
-                "stopping": False,
-                "log": [],
-                "name": SHOP_JSONLD_NAME
-            },
-            "price": {
-                "module": PriceExporter(self.manufacturers),
-                "scheduled": False,
-                "running": False,
-                "stopping": False,
-                "log": [],
-                "name": PRICE_NAME
-            },
-            "complete": {
-                "module": CompleteExporter(self.manufacturers),
-                "scheduled": False,
-                "running": False,
-                "stopping": False,
-                "log": [],
-                "name": COMPLETE_NAME
-            },
-            "custom": {
-                "module": CustomExporter(self.manufacturers),
-                "scheduled": False,
-                "running": False,
-                "stopping": False,
-                "log": [],
-                "name": CUSTOM_NAME
-            }
+exporter_classes = OrderedDict([
+    ("configurator", (ConfiguratorExporter, CONFIGURATOR_NAME)),
+    ("gambio", (GambioExporter, GAMBIO_NAME)),
+    ("shop", (ShopExporter, SHOP_NAME)),
+    ("shop_jsonld", (ShopJsonLDExporter, SHOP_JSONLD_NAME)),
+    ("price", (PriceExporter, PRICE_NAME)),
+    ("complete", (CompleteExporter, COMPLETE_NAME)),
+    ("custom", (CustomExporter, CUSTOM_NAME))
+])
+
+# Status der Exporter, der beim Neuladen in den neuen Zustand übernommen wird
+exporter_status_fields = ["scheduled", "running", "stopping", "log"]
+
+def build_state(report_progress=lambda text: None, preload=True):
+    # Baut einen vollständigen Zustand für den Runner auf, ohne den aktuellen
+    # Zustand zu verändern. Ohne preload werden die Exporter erst bei der
+    # ersten Verwendung erstellt.
+    report_progress("Hersteller werden eingelesen")
+    manufacturers, manufacturer_sources = None, None
+    if not preload:
+        manufacturers, manufacturer_sources = take_restored_manufacturers()
+    if manufacturers == None:
+        # Vor dem Einlesen, damit spätere Änderungen beim nächsten Start
+        # erkannt werden
+        manufacturer_sources = manufacturer_source_signatures()
+        manufacturers = parse_manufacturers()
+    with open(GENERAL_CONFIG_FILE, "r", encoding="utf-8") as config_file:
+        config = json.load(config_file)
+        max_products_per_file = config["max-articles-per-file"]
+        log_levels = config.get("log-levels", {})
+        watch = read_watch_config(config)
+
+    caches = None
+    if preload:
+        # Konfigurationen und Exporter werden in neue Caches eingelesen, die
+        # erst mit apply_state für alle Threads gelten
+        with building_caches() as caches:
+            report_progress("Konfigurationen werden eingelesen")
+            reload_configuration()
+            report_progress("GPSR Konfiguration wird eingelesen")
+            gpsr_load_configs()
+            exporters = build_exporters(manufacturers, log_levels, report_progress, preload)
+        report_progress("Artikelnummern werden eingelesen")
+        article_numbers = build_article_number_index(manufacturers)
+    else:
+        report_progress("GPSR Konfiguration wird eingelesen")
+        gpsr_get_configs()
+        exporters = build_exporters(manufacturers, log_levels, report_progress, preload)
+        # Wird vom Vorladen im Hintergrund aufgebaut
+        article_numbers = None
+
+    return {
+        "manufacturers": manufacturers,
+        "manufacturer_sources": manufacturer_sources,
+        "max_products_per_file": max_products_per_file,
+        "watch": watch,
+        "exporters": exporters,
+        "caches": caches,
+        "article_numbers": article_numbers
+    }
+
+def read_watch_config(config):
+    # Wird beim Start vom Validator geprüft, beim Neuladen hier, damit eine
+    # ungültige Änderung nur das Neuladen fehlschlagen lässt
+    watch = {
+        "exporters": config.get("watch-exporters", []),
+        "interval": config.get("watch-interval", 60),
+        "debounce": config.get("watch-debounce", 120)
+    }
+    for exporter_id in watch["exporters"]:
+        if not exporter_id in exporter_classes:
+            raise ValueError("Unbekannter Exporter '{}' in 'watch-exporters'".format(exporter_id))
+    for field in ["interval", "debounce"]:
+        if not is_positive_number(watch[field]):
+            raise ValueError("'watch-{}' muss eine positive Zahl sein".format(field))
+    return watch
+
+def is_positive_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+def build_exporters(manufacturers, log_levels, report_progress, preload):
+    exporters = OrderedDict()
+    for exporter_id, (exporter_class, exporter_name) in exporter_classes.items():
+        module = None
+        if preload:
+            report_progress("{} wird geladen".format(exporter_name))
+            module = exporter_class(manufacturers)
+            module.preload()
+        exporters[exporter_id] = {
+            "class": exporter_class,
+            "module": module,
+            "scheduled": False,
+            "running": False,
+            "stopping": False,
+            "log": [],
+            "name": exporter_name,
+            "log_level": get_log_level(log_levels.get(exporter_id, "DEBUG"))
         }
+    return exporters
+
+def reload_configuration():
+    # Wird in neuen, leeren Caches ausgeführt, die übrigen Konfigurationen
+    # werden von den neuen Exportern eingelesen
+    load_format_options(FORMATTING_CONFIG_FILE)
+    load_format_options(FORMATTING_JSONLD_CONFIG_FILE)
 
+class Runner:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.exporters = OrderedDict()
+        self.tasks = []
+        self.current_task = None
+        self.reloading = False
+        self.reload_status = {
+            "running": False,
+            "step": 0,
+            "steps": 4 + len(exporter_classes),
+            "text": None,
+            "error": None
+        }
+        # Damit der Server schnell erreichbar ist, werden Exporter und
+        # Formatierungen erst im Hintergrund geladen. Neuladen wartet, bis
+        # das abgeschlossen ist.
+        self.preloaded = threading.Event()
+        # Der Watch-Modus wird bei jedem Übernehmen der config.json neu
+        # eingerichtet, daher gibt es den Scheduler schon vorher
         self.scheduler = BackgroundScheduler(timezone=utc)
         self.scheduler.add_job(
             func=self.check_tasks,
@@ -146,18 +212,272 @@ class Runner:
             seconds=8,
             timezone="Europe/Berlin"
         )
-        self.tasks = []
+        self.watch = {"exporters": []}
+        self.watch_snapshot = None
+        self.watch_last_change = time.time()
+        self.watch_reload = False
+        self.watch_update_article_numbers = False
+        self.watch_pending = {}
+        self.apply_state(build_state(preload=False))
+        preload_thread = threading.Thread(target=self.__preload_in_background, daemon=True)
+        preload_thread.start()
         self.scheduler.start()
         logging.getLogger('apscheduler').setLevel("ERROR")
 
-        self.reloading = False
+    def setup_watch(self):
+        # Im Watch-Modus werden die BSVP Daten regelmäßig auf Änderungen
+        # geprüft und die konfigurierten Exporter für geänderte Hersteller
+        # automatisch zur Warteschlange hinzugefügt. Der erste Stand wird
+        # beim ersten Durchlauf aufgenommen, damit der Start nicht warten muss.
+        if self.scheduler.get_job("watch") != None:
+            self.scheduler.remove_job("watch")
+        # Geänderte Hersteller weiterhin beobachteter Exporter bleiben erhalten
+        self.watch_pending = {
+            exporter_id: self.watch_pending.get(exporter_id, set())
+            for exporter_id in self.watch["exporters"]
+        }
+        if not self.watch["exporters"]:
+            self.watch_snapshot = None
+            return
+        self.scheduler.add_job(
+            func=self.check_changes,
+            trigger="interval",
+            seconds=self.watch["interval"],
+            timezone="Europe/Berlin",
+            next_run_time=datetime.now(utc),
+            id="watch"
+        )
+
+    def __preload_in_background(self):
+        try:
+            try:
+                validate_format_configs()
+            except SystemExit as exit:
+                # sys.exit beendet nur diesen Thread, ungültige
+                # Formatierungen sollen aber wie bisher den Server beenden
+                print(exit.code, flush=True)
+                os._exit(1)
+            load_format_options(FORMATTING_CONFIG_FILE)
+            load_format_options(FORMATTING_JSONLD_CONFIG_FILE)
+            for exporter_id in list(self.exporters.keys()):
+                self.get_module(exporter_id).preload()
+            self.update_article_numbers()
+            self.save_snapshot()
+        except Exception:
+            print(traceback.format_exc(), flush=True)
+        finally:
+            self.preloaded.set()
+
+    def save_snapshot(self):
+        # Für einen schnellen Neustart werden die eingelesenen
+        # Konfigurationen und der Hersteller-Index gespeichert
+        try:
+            with self.lock:
+                manufacturers, manufacturer_sources = self.manufacturers, self.manufacturer_sources
+            save_snapshot(manufacturers, manufacturer_sources)
+        except Exception:
+            print(traceback.format_exc(), flush=True)
+
+    def get_module(self, exporter_id):
+        with self.lock:
+            exporter = self.exporters[exporter_id]
+            if exporter["module"] == None:
+                exporter["module"] = exporter["class"](self.manufacturers)
+            return exporter["module"]
+
+    def apply_state(self, state):
+        with self.lock:
+            # Status der bisherigen Exporter übernehmen, damit Exporter in der
+            # Warteschlange und deren Logs erhalten bleiben
+            for exporter_id, exporter_values in state["exporters"].items():
+                if exporter_id in self.exporters:
+                    for status_field in exporter_status_fields:
+                        exporter_values[status_field] = self.exporters[exporter_id][status_field]
+            if state["caches"] != None:
+                swap_caches(state["caches"])
+                # Ergebnisse der bisherigen Formatierungen freigeben
+                format_cache.clear()
+            self.manufacturers = state["manufacturers"]
+            self.manufacturer_sources = state["manufacturer_sources"]
+            self.max_products_per_file = state["max_products_per_file"]
+            self.watch = state["watch"]
+            self.exporters = state["exporters"]
+            self.setup_watch()
+            # Für die Vorschau, der Index der Artikelnummern wird im
+            # Hintergrund aufgebaut
+            self.article_numbers = state["article_numbers"]
+            self.preview_manufacturer_information = {}
 
     def reload(self):
-        self.reloading = True
-        self.setup()
+        # Der neue Zustand wird im Hintergrund aufgebaut, währenddessen
+        # beantwortet der alte Zustand weiterhin Anfragen
+        with self.lock:
+            if self.reloading or self.is_running() or self.current_task != None:
+                return False
+            self.reloading = True
+            self.reload_status.update({
+                "running": True,
+                "step": 0,
+                "text": None,
+                "error": None
+            })
+        reload_thread = threading.Thread(target=self.__reload_in_background, daemon=True)
+        reload_thread.start()
+        return True
+
+    def __report_reload_progress(self, text):
+        self.reload_status["step"] += 1
+        self.reload_status["text"] = text
+
+    def __reload_in_background(self):
+        try:
+            # Sonst würden die Exporter des Starts während des Vorladens
+            # ausgetauscht
+            self.preloaded.wait()
+            state = build_state(self.__report_reload_progress)
+            self.apply_state(state)
+            self.save_snapshot()
+            self.reload_status["text"] = "Aktualisierung beendet um {}".format(get_time())
+        except Exception as exception:
+            print(traceback.format_exc(), flush=True)
+            self.reload_status["error"] = str(exception)
+            self.reload_status["text"] = "Aktualisierung fehlgeschlagen um {}".format(get_time())
+        finally:
+            with self.lock:
+                self.reload_status["running"] = False
+                self.reloading = False
+
+    def check_changes(self):
+        snapshot = take_snapshot(DATA_DIRECTORY)
+        if self.watch_snapshot == None:
+            self.watch_snapshot = snapshot
+            return
+        changed_manufacturers, structure_changed = compare_snapshots(self.watch_snapshot, snapshot)
+        self.watch_snapshot = snapshot
+        now = time.time()
+        if changed_manufacturers:
+            # Weitere Änderungen abwarten, BSVP schreibt die Daten nach und
+            # nach
+            self.watch_last_change = now
+            self.watch_reload = self.watch_reload or structure_changed
+            self.watch_update_article_numbers = True
+            for pending_manufacturers in self.watch_pending.values():
+                pending_manufacturers.update(changed_manufacturers)
+            return
+        if now - self.watch_last_change < self.watch["debounce"]:
+            return
+
+        # Neue Hersteller oder Produkte sind erst nach dem Neuladen im Index
+        if self.watch_reload:
+            if self.reload():
+                self.watch_reload = False
+            return
+
+        # Geänderte Produkte können andere Artikelnummern haben
+        if self.watch_update_article_numbers:
+            self.watch_update_article_numbers = False
+            self.update_article_numbers()
+
+        for exporter_id, pending_manufacturers in self.watch_pending.items():
+            if not pending_manufacturers:
+                continue
+            selected_manufacturers = sorted(pending_manufacturers)
+            error_code = self.add_task(exporter_id, selected_manufacturers)
+            # Bei Fehler (z.B. Exporter läuft noch) wird es beim nächsten
+            # Durchlauf erneut versucht
+            if error_code == None:
+                self.exporters[exporter_id]["log"].append(
+                    "Automatisch gestartet nach Änderungen bei: {}".format(", ".join(selected_manufacturers))
+                )
+                pending_manufacturers.clear()
+
+    def update_article_numbers(self):
+        # Liest nur geänderte Produkte neu ein, läuft nie während einer
+        # Anfrage
+        manufacturers = self.manufacturers
+        article_numbers = build_article_number_index(manufacturers)
+        with self.lock:
+            # Beim Neuladen wurde inzwischen ein eigener Index übernommen
+            if self.manufacturers is manufacturers:
+                self.article_numbers = article_numbers
+
+    def find_product(self, article_number):
+        # Gibt Hersteller und Pfad des Produkts zur Artikelnummer zurück
+        manufacturers = self.manufacturers
+        article_numbers = self.article_numbers
+        if article_numbers != None and article_number in article_numbers:
+            return article_numbers[article_number]
+        # Neue Produkte ohne Eintrag im Index oder solange der Index noch
+        # aufgebaut wird über den Ordnernamen finden
+        for manufacturer_name, manufacturer in manufacturers.items():
+            if article_number in manufacturer["products"]:
+                return manufacturer_name, manufacturer["products"][article_number]
+        return None
 
-    def __init__(self):
-        self.setup()
+    def get_preview_manufacturer_information(self, manufacturer_name):
+        # ILUGG Dateien werden nur neu eingelesen, wenn sie sich geändert haben
+        manufacturer_path = self.manufacturers[manufacturer_name]["path"]
+        ilugg_path = manufacturer_path + "/" + manufacturer_name + MANUFACTURER_INFO_ENDING
+        signature = stat_signature(ilugg_path)
+        cached = self.preview_manufacturer_information.get(manufacturer_name)
+        if cached != None and cached[0] == signature:
+            return cached[1]
+        result = get_manufacturer_information(manufacturer_path, manufacturer_name)
+        self.preview_manufacturer_information[manufacturer_name] = (signature, result)
+        return result
+
+    def preview(self, exporter_id, article_number):
+        # Erzeugt die Zeile eines einzelnen Produkts im Speicher, ohne einen
+        # Export zu starten oder Dateien zu schreiben
+        if not exporter_id in self.exporters:
+            return None, "UNBEKANNTER_EXPORTER"
+        # Die Exporter werden nur im Hintergrund vorgeladen (z.B. der Index
+        # der Header des Komplett-Exports), nie während einer Anfrage
+        if not self.preloaded.is_set():
+            return None, "WIRD_GELADEN"
+        product = self.find_product(article_number)
+        if product == None:
+            return None, "NICHT_GEFUNDEN"
+        manufacturer_name, product_path = product
+        if not os.path.exists(product_path):
+            return None, "PROD_UNTERSCHIEDLICH"
+        fields, attribute_names, attribute_types, error_code = parse_product(product_path)
+        if error_code != None:
+            return None, error_code
+
+        exporter_module = self.get_module(exporter_id)
+        manufacturer_information = None
+        if exporter_module.uses_manufacturer_information:
+            manufacturer_information, error_code = self.get_preview_manufacturer_information(manufacturer_name)
+            if error_code != None:
+                return None, "ILUGG_" + error_code
+
+        logger = Logger()
+        with logger.muted():
+            skip_product, error_code = exporter_module.skip_product(fields)
+            header_fields, row = None, None
+            if error_code == None:
+                try:
+                    header_fields, row, error_code = exporter_module.render({
+                        "fields": fields,
+                        "attribute_names": attribute_names,
+                        "attribute_types": attribute_types,
+                        "manufacturer_name": manufacturer_name,
+                        "manufacturer_information": manufacturer_information
+                    })
+                except Exception as exception:
+                    print(traceback.format_exc(), flush=True)
+                    error_code = str(exception)
+
+        preview_fields = None
+        if row != None:
+            preview_fields = OrderedDict(zip(header_fields, row))
+        return {
+            "manufacturer": manufacturer_name,
+            "skipped": skip_product,
+            "error": error_code,
+            "fields": preview_fields
+        }, None
 
     def get_manufacturers(self):
         return list(self.manufacturers.keys())
@@ -166,7 +486,7 @@ class Runner:
         # Module entfernen, kann (und soll) nicht mitgeschickt werden
         sendable_exporters = {}
         for exporter_key, exporter_values in self.exporters.items():
-            last_export_date = exporter_values["module"].last_export_date(exporter_values["running"])
+            last_export_date = exporter_last_export_date(exporter_values["name"], exporter_values["running"])
             if last_export_date != None:
                 last_export_date = datetime.utcfromtimestamp(last_export_date).strftime("%d.%m.%Y")
             sendable_exporters[exporter_key] = {
@@ -177,6 +497,7 @@ class Runner:
                 "log": exporter_values["log"],
                 "last": last_export_date
             }
+        sendable_exporters["reload"] = dict(self.reload_status)
         return sendable_exporters
 
     def is_running(self):
@@ -186,45 +507,55 @@ class Runner:
         return is_running
 
     def check_tasks(self):
-        if not self.is_running() and len(self.tasks) > 0:
-            self.run(self.tasks.pop(0))
+        # Während des Neuladens werden keine Exporte gestartet, die
+        # Warteschlange wird danach mit dem neuen Zustand abgearbeitet
+        with self.lock:
+            if self.reloading or self.is_running() or len(self.tasks) == 0:
+                return
+            self.current_task = self.tasks.pop(0)
+        try:
+            self.run(self.current_task)
+        finally:
+            self.current_task = None
 
     def add_task(self, exporter, selected_manufacturers):
-        if self.reloading:
-            return "RELOADING"
-        if self.exporters[exporter]["scheduled"]:
-            return "SCHEDULED"
-        if self.exporters[exporter]["running"]:
-            return "RUNNING"
-
-        self.tasks.append({
-            "exporter": exporter,
-            "selected_manufacturers": selected_manufacturers
-        })
-        self.exporters[exporter]["scheduled"] = True
-        self.exporters[exporter]["log"] = ["Export um {} zur Warteschlange hinzugefügt".format(get_time())]
-
-        # Wenn Hersteller eingeschränkt werden können, sollen diese
-        # angezeigt werden
-        exporter_module = self.exporters[exporter]["module"]
-        show_selected_manufacturers = exporter_module.skip_manufacturer("Not a manufacturer", selected_manufacturers)
-        if show_selected_manufacturers:
-            self.exporters[exporter]["log"].append(
-                "Ausgewählte Hersteller: {}".format(", ".join(selected_manufacturers))
-            )
-        return None
+        with self.lock:
+            if self.reloading:
+                return "RELOADING"
+            if self.exporters[exporter]["scheduled"]:
+                return "SCHEDULED"
+            if self.exporters[exporter]["running"]:
+                return "RUNNING"
+
+            self.tasks.append({
+                "exporter": exporter,
+                "selected_manufacturers": selected_manufacturers
+            })
+            self.exporters[exporter]["scheduled"] = True
+            self.exporters[exporter]["log"] = ["Export um {} zur Warteschlange hinzugefügt".format(get_time())]
+
+            # Wenn Hersteller eingeschränkt werden können, sollen diese
+            # angezeigt werden
+            exporter_module = self.get_module(exporter)
+            show_selected_manufacturers = exporter_module.skip_manufacturer("Not a manufacturer", selected_manufacturers)
+            if show_selected_manufacturers:
+                self.exporters[exporter]["log"].append(
+                    "Ausgewählte Hersteller: {}".format(", ".join(selected_manufacturers))
+                )
+            return None
 
     def stop_task(self, exporter_id):
-        exporter = self.exporters[exporter_id]
-        if exporter["running"]:
-            exporter["stopping"] = True
-            return None
-        if exporter["scheduled"]:
-            self.tasks = [t for t in self.tasks if t["exporter"] != exporter_id]
-            exporter["scheduled"] = False
-            exporter["log"].append("Export abgebrochen um {}".format(get_time()))
-            return None
-        return "NOT_RUNNING"
+        with self.lock:
+            exporter = self.exporters[exporter_id]
+            if exporter["running"]:
+                exporter["stopping"] = True
+                return None
+            if exporter["scheduled"]:
+                self.tasks = [t for t in self.tasks if t["exporter"] != exporter_id]
+                exporter["scheduled"] = False
+                exporter["log"].append("Export abgebrochen um {}".format(get_time()))
+                return None
+            return "NOT_RUNNING"
 
     def split_large_result(self, exporter_module):
         output_directory = exporter_module.output_directory()
@@ -254,21 +585,42 @@ class Runner:
                             csv_writer.writerow(current_product.values())
                         current_product_index += 1
 
+    def __write_batch(self, exporter_module, batch, manufacturer_context):
+        # Schreibt die gesammelten (Produktname, Parameter) und gibt die
+        # Anzahl der Fehler zurück
+        logger = Logger()
+        try:
+            error_codes = exporter_module.write_batch(
+                [parameters for product_name, parameters in batch],
+                manufacturer_context
+            )
+        except Exception as exception:
+            print(traceback.format_exc(), flush=True)
+            error_codes = [str(exception)] * len(batch)
+        skips = 0
+        for (product_name, parameters), error_code in zip(batch, error_codes):
+            if error_code != None:
+                skips += 1
+                write_skip_log(logger, product_name, error_code)
+        return skips
+
     def run(self, task):
         exporter_id = task["exporter"]
         selected_manufacturers = task["selected_manufacturers"]
         exporter = self.exporters[exporter_id]
-        exporter_module = exporter["module"]
+        exporter_module = self.get_module(exporter_id)
         logger = Logger()
         logger.set_path(exporter_id)
+        logger.set_level(exporter["log_level"])
         if not exporter["running"]:
             exporter["scheduled"] = False
             exporter["running"] = True
 
             start_text = "Export gestartet um {}".format(get_time())
             exporter["log"].append(start_text)
-            logger.log("\n".join(exporter["log"]))
+            logger.log("\n".join(exporter["log"]), level=SKIP)
             exporter_module.setup()
+            format_cache.reset_stats()
 
             # Variablen für Log
             current_manufacturer = None
@@ -290,9 +642,13 @@ class Runner:
                 if exporter_module.skip_manufacturer(manufacturer_name, selected_manufacturers):
                     continue
 
-                logger.log("\n{}".format(current_manufacturer))
+                logger.log("\n{}", current_manufacturer, level=SKIP)
                 exporter["log"].append(current_manufacturer)
 
+                # Eingelesene Produkte werden gesammelt und in Blöcken von
+                # batch_size Produkten geschrieben
+                batch = []
+
                 manufacturer_information = None
                 if exporter_module.uses_manufacturer_information:
                     manufacturer_information, error_code = get_manufacturer_information(
@@ -303,6 +659,10 @@ class Runner:
                         exporter["log"][-1] = "{} übersprungen, ILUGG Datei konnte nicht gelesen werden".format(current_manufacturer)
                         write_skip_log(logger, "ILUGG", error_code)
                         continue
+                manufacturer_context = {
+                    "manufacturer_name": manufacturer_name,
+                    "manufacturer_information": manufacturer_information
+                }
 
                 for product_name, product_path in manufacturer["products"].items():
                     if exporter["stopping"]:
@@ -319,6 +679,9 @@ class Runner:
                         write_skip_log(logger, product_name, "PROD_UNTERSCHIEDLICH")
                         continue
 
+                    if exporter_module.prefilter_product(product_path):
+                        continue
+
                     fields, attribute_names, attribute_types, error_code = parse_product(product_path)
                     if error_code != None:
                         current_product_skips += 1
@@ -333,28 +696,28 @@ class Runner:
                     if skip_product:
                         continue
 
-                    try:
-                        error_code = exporter_module.write_to_csv({
-                            "fields": fields,
-                            "attribute_names": attribute_names,
-                            "attribute_types": attribute_types,
-                            "manufacturer_name": manufacturer_name,
-                            "manufacturer_information": manufacturer_information
-                        })
-                    except Exception as exception:
-                        print(traceback.format_exc(), flush=True)
-                        error_code = str(exception)
-
-                    if error_code != None:
-                        current_product_skips += 1
-                        write_skip_log(logger, product_name, error_code)
+                    parameters = {
+                        "fields": fields,
+                        "attribute_names": attribute_names,
+                        "attribute_types": attribute_types,
+                        "manufacturer_name": manufacturer_name,
+                        "manufacturer_information": manufacturer_information
+                    }
+                    batch.append((product_name, parameters))
+                    if exporter_module.batch_size != None and len(batch) >= exporter_module.batch_size:
+                        current_product_skips += self.__write_batch(exporter_module, batch, manufacturer_context)
+                        batch = []
+
+                if batch:
+                    current_product_skips += self.__write_batch(exporter_module, batch, manufacturer_context)
 
                 manufacturer_summary = "{} gesamt, {} Fehler".format(
                     current_product_number,
                     current_product_skips
                 )
                 exporter["log"][-1] = "{} ({})".format(current_manufacturer, manufacturer_summary)
-                logger.log(manufacturer_summary)
+                logger.log(manufacturer_summary, level=SKIP)
+                logger.flush()
 
             # Export abschließen
             if stopped:
@@ -364,5 +727,12 @@ class Runner:
                 self.split_large_result(exporter_module)
                 end_text = "Export beendet um {}".format(get_time())
             exporter["log"].append(end_text)
-            logger.log("\n" + end_text)
+            format_cache_stats = format_cache.stats_text()
+            if format_cache_stats != None:
+                logger.log("\n" + format_cache_stats, level=INFO)
+            logger.log("\n" + end_text, level=SKIP)
+            logger.flush()
             exporter["running"] = False
+
+            # Während des Exports geladene Konfigurationen ebenfalls speichern
+            self.save_snapshot()
@@ -0,0 +1,199 @@
+import os
+import pickle
+from collections import OrderedDict
+from modules.constants import CACHE_DIRECTORY, SNAPSHOT_FILE, CONFIGS_DIRECTORY, DATA_DIRECTORY, \
+    CONFIGURATOR_NAME, FORMATTING_CONFIG_FILE, FORMATTING_JSONLD_CONFIG_FILE, TOOLTIP_PATH, \
+    ATTRIBUTES_PATH, JSONLD_MAPPING_PATH, MANUFACTURER_ENDING
+from modules import formatter
+from modules.parser import gpsr
+from modules.parser.tooltips import loaded_tooltips
+from modules.parser.attributes import loaded_attributes
+from modules.exporter.configurator.configs import loaded_configs
+from modules.exporter.shop.jsonld import mapping_loader
+from modules.source_signatures import source_unchanged, source_signatures, recorded_sources
+
+# Wird erhöht, wenn sich der Aufbau des Snapshots ändert
+SNAPSHOT_VERSION = 3
+
+# Aus dem Snapshot wiederhergestellter Hersteller-Index mit den Signaturen
+# seiner Quellen, wird beim Start vom Runner übernommen
+restored_manufacturers = None
+
+def snapshot_path():
+    return os.path.join(CACHE_DIRECTORY, SNAPSHOT_FILE)
+
+def existing_files(paths):
+    return [path for path in paths if os.path.isfile(path)]
+
+def directory_files(directory, ending):
+    if not os.path.isdir(directory):
+        return []
+    return existing_files(sorted(
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if file_name.endswith(ending)
+    ))
+
+def configurator_directory():
+    return CONFIGS_DIRECTORY + CONFIGURATOR_NAME + "/"
+
+def formatting_files():
+    return [FORMATTING_CONFIG_FILE, FORMATTING_JSONLD_CONFIG_FILE]
+
+def formatting_sources():
+    return [os.path.join(CONFIGS_DIRECTORY, config_file) for config_file in formatting_files()]
+
+def collect_formatting():
+    formatting = {}
+    for config_file in formatting_files():
+        format_configs = formatter.format_configs()
+        format_options = formatter.loaded_format_options()
+        if not config_file in format_configs or not config_file in format_options:
+            return None
+        formatting[config_file] = (
+            format_configs[config_file],
+            format_options[config_file]
+        )
+    return formatting
+
+def restore_formatting(formatting, sources):
+    recorded_sources().update(sources)
+    formatter.format_cache.clear()
+    for config_file, (format_config, format_options) in formatting.items():
+        formatter.format_configs()[config_file] = format_config
+        formatter.loaded_format_options()[config_file] = format_options
+
+def directory_sources(directory, ending):
+    # Mit dem Ordner, damit auch nach dem Einlesen gelöschte Dateien
+    # erkannt werden
+    if not os.path.isdir(directory):
+        return []
+    return [directory] + directory_files(directory, ending)
+
+def gpsr_sources():
+    return directory_sources(os.path.join(CONFIGS_DIRECTORY, "GPSR"), ".yml")
+
+def restore_gpsr(gpsr_configs, sources):
+    recorded_sources().update(sources)
+    gpsr.gpsr_cache()["configs"] = gpsr_configs
+
+def restore_tooltips(tooltips, sources):
+    recorded_sources().update(sources)
+    loaded_tooltips()[TOOLTIP_PATH] = tooltips
+
+def restore_attributes(attributes, sources):
+    recorded_sources().update(sources)
+    loaded_attributes()[ATTRIBUTES_PATH] = attributes
+
+def restore_configurator(configs, sources):
+    recorded_sources().update(sources)
+    loaded_configs()[configurator_directory()] = configs
+
+def restore_jsonld_mapping(mapping, sources):
+    recorded_sources().update(sources)
+    mapping_loader.mapping_cache()["mappings"] = mapping
+
+def manufacturer_sources():
+    if not os.path.isdir(DATA_DIRECTORY):
+        return []
+    return [DATA_DIRECTORY] + sorted(
+        os.path.join(DATA_DIRECTORY, directory)
+        for directory in os.listdir(DATA_DIRECTORY)
+        if directory.endswith(MANUFACTURER_ENDING)
+    )
+
+def manufacturer_source_signatures():
+    # Vor dem Einlesen der Hersteller aufrufen
+    return source_signatures(manufacturer_sources())
+
+def restore_manufacturers(manufacturers, sources):
+    global restored_manufacturers
+    restored_manufacturers = (manufacturers, sources)
+
+# Pro Abschnitt: Quelldateien, aktuell geladene Daten und Wiederherstellung.
+# Jeder Abschnitt wird einzeln geprüft, geänderte Abschnitte werden beim
+# Start normal eingelesen. Gespeichert werden die Signaturen, die beim
+# Einlesen der Daten aufgenommen wurden.
+snapshot_sections = OrderedDict([
+    ("formatting", (formatting_sources, collect_formatting, restore_formatting)),
+    ("gpsr", (gpsr_sources, lambda: gpsr.gpsr_cache().get("configs") or None, restore_gpsr)),
+    ("tooltips", (
+        lambda: [TOOLTIP_PATH],
+        lambda: loaded_tooltips().get(TOOLTIP_PATH),
+        restore_tooltips
+    )),
+    ("attributes", (
+        lambda: [ATTRIBUTES_PATH],
+        lambda: loaded_attributes().get(ATTRIBUTES_PATH),
+        restore_attributes
+    )),
+    ("configurator", (
+        lambda: directory_sources(configurator_directory(), ".json"),
+        lambda: loaded_configs().get(configurator_directory()),
+        restore_configurator
+    )),
+    ("jsonld_mapping", (
+        lambda: [JSONLD_MAPPING_PATH],
+        lambda: mapping_loader.mapping_cache().get("mappings"),
+        restore_jsonld_mapping
+    )),
+    ("manufacturers", (manufacturer_sources, lambda: None, restore_manufacturers))
+])
+
+def load_snapshot():
+    try:
+        with open(snapshot_path(), "rb") as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+    except Exception:
+        return {}
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return {}
+    return snapshot["sections"]
+
+def restore_snapshot():
+    # Stellt alle Abschnitte wieder her, deren Quelldateien sich seit dem
+    # Speichern nicht geändert haben
+    restored_sections = []
+    sections = load_snapshot()
+    for section_name, (get_sources, collect, restore) in snapshot_sections.items():
+        if not section_name in sections:
+            continue
+        section = sections[section_name]
+        sources = section["sources"]
+        if list(sources.keys()) != get_sources():
+            continue
+        if not all(source_unchanged(path, signature) for path, signature in sources.items()):
+            continue
+        restore(section["data"], sources)
+        restored_sections.append(section_name)
+    return restored_sections
+
+def take_restored_manufacturers():
+    # Gibt Hersteller-Index und Signaturen zurück oder (None, None)
+    global restored_manufacturers
+    restored = restored_manufacturers
+    restored_manufacturers = None
+    return restored or (None, None)
+
+def save_snapshot(manufacturers, manufacturer_sources):
+    sections = {}
+    for section_name, (get_sources, collect, restore) in snapshot_sections.items():
+        if section_name == "manufacturers":
+            data, signatures = manufacturers, manufacturer_sources
+        else:
+            data, signatures = collect(), recorded_sources()
+        if data == None:
+            continue
+        # Ohne Signatur vom Einlesen (z.B. eine seitdem neue Datei) wird der
+        # Abschnitt beim nächsten Start normal eingelesen
+        paths = get_sources()
+        if not all(path in signatures for path in paths):
+            continue
+        sources = OrderedDict((path, signatures[path]) for path in paths)
+        sections[section_name] = { "sources": sources, "data": data }
+
+    os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+    temporary_path = snapshot_path() + ".tmp"
+    with open(temporary_path, "wb") as snapshot_file:
+        pickle.dump({ "version": SNAPSHOT_VERSION, "sections": sections }, snapshot_file, pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, snapshot_path())
@@ -0,0 +1,49 @@
+import os
+import hashlib
+from modules.config_caches import get_cache
+
+def file_hash(path):
+    with open(path, "rb") as source_file:
+        return hashlib.sha1(source_file.read()).hexdigest()
+
+def source_signature(path):
+    stat = os.stat(path)
+    signature = { "mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": None }
+    # Für Ordner reicht die Änderungszeit, sie ändert sich mit jedem neuen
+    # oder gelöschten Eintrag
+    if not os.path.isdir(path):
+        signature["hash"] = file_hash(path)
+    return signature
+
+def source_unchanged(path, signature):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_mtime_ns == signature["mtime"] and stat.st_size == signature["size"]:
+        return True
+    # Geänderte Änderungszeit, aber vielleicht gleicher Inhalt
+    if signature["hash"] == None or stat.st_size != signature["size"]:
+        return False
+    return file_hash(path) == signature["hash"]
+
+# Signaturen der Quelldateien zum Zeitpunkt des Einlesens. Sie liegen in den
+# Caches der Konfigurationen und werden mit diesen ausgetauscht, damit ein
+# Snapshot immer die Signaturen der gespeicherten Daten enthält.
+def recorded_sources():
+    return get_cache("source_signatures")
+
+def source_signatures(paths):
+    signatures = {}
+    for path in paths:
+        try:
+            signatures[path] = source_signature(path)
+        except OSError:
+            # Fehlt im Snapshot, der Abschnitt wird dann nicht gespeichert
+            continue
+    return signatures
+
+def record_sources(paths):
+    # Vor dem Einlesen aufrufen: spätere Änderungen werden so beim nächsten
+    # Start erkannt
+    recorded_sources().update(source_signatures(paths))
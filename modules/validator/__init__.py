@@ -12,5 +12,9 @@ def validate_setup(general_config_file, configurator_name, shop_name):
     )
     validate_configurator_configs(CONFIGS_DIRECTORY, configurator_name)
     validate_shop_config(CONFIGS_DIRECTORY, shop_name)
+
+def validate_format_configs():
+    # Die Formatierungen werden beim Vorladen im Hintergrund geprüft, damit
+    # der Server nicht auf das Einlesen warten muss
     validate_format_config(CONFIGS_DIRECTORY, FORMATTING_CONFIG_FILE)
     validate_format_config(CONFIGS_DIRECTORY, FORMATTING_JSONLD_CONFIG_FILE)
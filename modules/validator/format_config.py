@@ -1,7 +1,5 @@
 import os, sys
-import yaml
-from modules import formatter
-from modules.formatter import formatters
+from modules.formatter import load_format_config
 from .helpers import validate_required_fields, validate_list
 
 replacement_fields = ["vorher", "nachher", "felder"]
@@ -10,8 +8,8 @@ replacement_lists = ["vorher", "felder"]
 def validate_format_config(export_configs_directory, format_config_file_name):
     if format_config_file_name in os.listdir(export_configs_directory):
         format_config_file_path = os.path.join(export_configs_directory, format_config_file_name)
-        with open(os.path.join(format_config_file_path), "r") as formatting_config_file:
-            format_config = yaml.load(formatting_config_file, Loader=yaml.FullLoader)
+        # Die eingelesene Konfiguration wird vom Formatter wiederverwendet
+        format_config = load_format_config(format_config_file_name)
 
         for format_rule in format_config:
             validate_list(
@@ -1,7 +1,7 @@
 import os
 import sys
 import json
-from .helpers import validate_required_fields, validate_list
+from .helpers import validate_required_fields, validate_list, validate_positive_number
 
 general_config_fields = [
     "konfigurator-csv-separator",
@@ -24,6 +24,21 @@ def validate_general_config(general_config_file, configurator_name, shop_name):
     # Überprüfung, ob es die erforderlichen Felder gibt
     validate_required_fields(config, general_config_file, general_config_fields)
 
+    # Optionaler Watch-Modus
+    if "watch-exporters" in config:
+        validate_list(config, "watch-exporters", general_config_file)
+        # Erst hier importiert, der Runner verwendet selbst den Validator
+        from modules.runner import exporter_classes
+        for exporter_id in config["watch-exporters"]:
+            if not exporter_id in exporter_classes:
+                sys.exit(
+                    "[FEHLER] Unbekannter Exporter '{}' in 'watch-exporters' in {}, erlaubt sind: {}"
+                    .format(exporter_id, general_config_file, ", ".join(exporter_classes.keys()))
+                )
+    for field in ["watch-interval", "watch-debounce"]:
+        if field in config:
+            validate_positive_number(config, field, general_config_file)
+
     # Validierung des angegebenen Encodings
     test_path = "test.csv"
     try:
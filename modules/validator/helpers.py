@@ -14,3 +14,11 @@ def validate_list(config, field, file_path, insertion = ""):
             "[FEHLER] Das Feld '{}' {}in {} enthält keine Liste"
             .format(field, insertion, file_path)
         )
+
+def validate_positive_number(config, field, file_path):
+    value = config[field]
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        sys.exit(
+            "[FEHLER] Das Feld '{}' in {} muss eine positive Zahl sein"
+            .format(field, file_path)
+        )
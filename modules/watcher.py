@@ -0,0 +1,48 @@
+import os
+from modules.constants import MANUFACTURER_ENDING, PRODUCT_ENDING
+
+def stat_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def snapshot_manufacturer(manufacturer_path):
+    # Pro Eintrag im Hersteller-Ordner wird nur Änderungszeit und Größe
+    # gemerkt, für Produkte die der .prod Datei im Produkt-Ordner
+    snapshot = {}
+    with os.scandir(manufacturer_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.name.endswith(PRODUCT_ENDING) or entry.name == PRODUCT_ENDING:
+                    continue
+                snapshot[entry.name] = stat_signature(os.path.join(entry.path, entry.name))
+            else:
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def take_snapshot(bsvp_directory):
+    snapshot = {}
+    with os.scandir(bsvp_directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(MANUFACTURER_ENDING) or not entry.is_dir():
+                continue
+            manufacturer_name = entry.name.split(MANUFACTURER_ENDING)[0]
+            snapshot[manufacturer_name] = snapshot_manufacturer(entry.path)
+    return snapshot
+
+def compare_snapshots(old_snapshot, new_snapshot):
+    # Gibt die geänderten Hersteller zurück und ob sich Hersteller oder
+    # Produkte geändert haben, die nicht im bisherigen Index stehen
+    changed_manufacturers = set()
+    structure_changed = old_snapshot.keys() != new_snapshot.keys()
+    for manufacturer_name, manufacturer_snapshot in new_snapshot.items():
+        old_manufacturer_snapshot = old_snapshot.get(manufacturer_name)
+        if old_manufacturer_snapshot == manufacturer_snapshot:
+            continue
+        changed_manufacturers.add(manufacturer_name)
+        if old_manufacturer_snapshot == None or old_manufacturer_snapshot.keys() != manufacturer_snapshot.keys():
+            structure_changed = True
+    return changed_manufacturers, structure_changed
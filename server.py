@@ -10,12 +10,16 @@ from modules.logger import Logger
 from modules.constants import GENERAL_CONFIG_FILE, CONFIGURATOR_NAME, \
     SHOP_NAME
 from modules.download import zip_result
+from modules.snapshot import restore_snapshot
 
 import os
 
 app = Flask(__name__)
 CORS(app)
 
+# Unveränderte Konfigurationen aus dem letzten Lauf übernehmen, bevor sie
+# validiert und von den Exportern verwendet werden
+restore_snapshot()
 validate_setup(GENERAL_CONFIG_FILE, CONFIGURATOR_NAME, SHOP_NAME)
 runner = Runner()
 
@@ -29,11 +33,10 @@ def build_info():
 
 @app.route("/reload", methods=["GET"])
 def reload():
-    if runner.is_running():
-        return json.dumps({ "success": False })
-    else:
-        runner.reload()
-        return json.dumps({ "success": True })
+    # Das Neuladen läuft im Hintergrund, der Fortschritt wird über
+    # /exporters abgefragt
+    success = runner.reload()
+    return json.dumps({ "success": success })
 
 @app.route("/manufacturers", methods=["GET"])
 def manufacturers():
@@ -62,6 +65,16 @@ def stop():
     else:
         return json.dumps(runner.get_exporters())
 
+@app.route("/preview", methods=["GET"])
+def preview():
+    exporter = request.args.get("exporter")
+    article_number = request.args.get("artnr")
+    preview, error_code = runner.preview(exporter, article_number)
+    if error_code != None:
+        return json.dumps({ "error": True, "code": error_code })
+    # Reihenfolge der Spalten beibehalten
+    return json.dumps(preview, sort_keys=False)
+
 def send_attachement(path):
     try:
         return send_file(path, as_attachment=True)
@@ -72,13 +85,15 @@ def send_attachement(path):
 def get_log():
     exporter = request.args.get("exporter")
     logger = Logger()
+    # Einträge eines laufenden Exports sind eventuell noch gepuffert
+    logger.flush()
     log_path = logger.last_log_path(exporter)
     return send_attachement(log_path)
 
 @app.route("/result", methods=["GET"])
 def get_result():
     exporter = request.args.get("exporter")
-    exporter_path = runner.exporters[exporter]["module"].output_directory()
+    exporter_path = runner.get_module(exporter).output_directory()
     if len(os.listdir(exporter_path)) == 1:
         file_path = os.path.join(exporter_path, os.listdir(exporter_path)[0])
     else:
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+from unittest import mock
+from modules.constants import PRODUCT_TYPE_ID, TECHDATA
+from modules.exporter.configurator import ConfiguratorExporter
+
+# Formatierung, die für den Wert "kaputt" fehlschlägt
+
+def failing_format_field(value, field_name):
+    if value == "kaputt":
+        raise ValueError("Formatierung fehlgeschlagen")
+    return value.upper()
+
+def failing_format_column(values, field_name):
+    return [(failing_format_field(value, field_name), []) for value in values]
+
+def product(article_number, name, product_type="Kühlschrank", manufacturer="Cool"):
+    fields = OrderedDict([("ARTNR", article_number), ("NAME", name)])
+    if manufacturer != None:
+        fields["MANUFACTURER"] = manufacturer
+    fields[TECHDATA] = {PRODUCT_TYPE_ID: product_type}
+    return {"fields": fields}
+
+class ConfiguratorBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.directory, "kuehlschrank.csv")
+        self.other_output_path = os.path.join(self.directory, "tisch.csv")
+        # Ohne Konfigurationsdateien, nur die für write_batch nötigen Werte
+        exporter = ConfiguratorExporter.__new__(ConfiguratorExporter)
+        exporter.csv_separator = ";"
+        exporter.csv_encoding = "utf-8"
+        exporter.csv_quote_char = "\""
+        exporter.csv_escape_char = "\\"
+        exporter.columnar_formatting = True
+        exporter.skipping_policy = {"manufacturers": False, "delivery_status": True}
+        exporter.export_configs = {}
+        for product_type, output_path in [("Kühlschrank", self.output_path), ("Tisch", self.other_output_path)]:
+            exporter.export_configs[product_type] = {
+                "felder": OrderedDict([("ARTNR", "Artikelnummer"), ("NAME", "Name")]),
+                "kombinationen": OrderedDict(),
+                "base_output_paths": [output_path],
+                "manufacturer_output_paths": {}
+            }
+        self.exporter = exporter
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_rows(self, path):
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as file:
+            return file.read().splitlines()
+
+    def write_batch(self, products):
+        with mock.patch("modules.exporter.configurator.format_field", failing_format_field), \
+                mock.patch("modules.exporter.configurator.format_column", failing_format_column):
+            return self.exporter.write_batch(products, None)
+
+    def test_formatting_error_only_fails_its_product(self):
+        error_codes = self.write_batch([
+            product("A-1", "eins"),
+            product("A-2", "kaputt"),
+            product("A-3", "drei"),
+            product("B-1", "tisch", "Tisch")
+        ])
+        self.assertEqual(error_codes, [None, "Formatierung fehlgeschlagen", None, None])
+        self.assertEqual(self.read_rows(self.output_path), ["A-1;EINS", "A-3;DREI"])
+        self.assertEqual(self.read_rows(self.other_output_path), ["B-1;TISCH"])
+
+    def test_without_errors(self):
+        error_codes = self.write_batch([product("A-1", "eins"), product("A-2", "zwei")])
+        self.assertEqual(error_codes, [None, None])
+        self.assertEqual(self.read_rows(self.output_path), ["A-1;EINS", "A-2;ZWEI"])
+
+    def test_missing_manufacturer_is_reported_for_every_product_type(self):
+        # Wie beim einzelnen Schreiben mit write_to_csv
+        products = [
+            product("A-1", "eins"),
+            product("A-2", "ohne", manufacturer=None),
+            product("C-1", "ohne", "Unbekannt", manufacturer=None),
+            product("C-2", "drei", "Unbekannt")
+        ]
+        expected_error_codes = [None, "'MANUFACTURER'", "'MANUFACTURER'", None]
+        self.assertEqual(self.write_batch(products), expected_error_codes)
+        self.assertEqual(self.read_rows(self.output_path), ["A-1;EINS"])
+        self.exporter.columnar_formatting = False
+        self.assertEqual(self.write_batch(products), expected_error_codes)
+        self.assertEqual(self.read_rows(self.output_path), ["A-1;EINS", "A-1;EINS"])
+
+    def test_prefilter_reads_products_without_manufacturer(self):
+        product_path = os.path.join(self.directory, "C-1.prod")
+        def prefilter(*fields):
+            with open(product_path, "w", encoding="utf-8") as product_file:
+                product_file.write("§+§".join(fields + (
+                    "TECHDATA=A::Produkttyp::Unbekannt@[[x.{}]]§-§A::Name::x@[[x.0000001]]".format(PRODUCT_TYPE_ID),
+                    "DELSTAT=1"
+                )))
+            return self.exporter.prefilter_product(product_path)
+        self.assertTrue(prefilter("ARTNR=C-1", "MANUFACTURER=Cool"))
+        self.assertFalse(prefilter("ARTNR=C-1"))
+
+if __name__ == "__main__":
+    unittest.main()
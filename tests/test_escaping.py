@@ -0,0 +1,82 @@
+import html
+import random
+import unittest
+from modules.exporter.utils.escaped_characters import escaped_characters
+from modules.exporter.utils.unescape_bsvp import unescape_bsvp_to_html, unescape_bsvp_to_text
+from modules.exporter.shop.utils.html_escape import html_escape
+
+# Bisherige Umsetzungen mit einzelnen str.replace Aufrufen, die neuen
+# Funktionen müssen für alle Texte dasselbe Ergebnis liefern
+
+def previous_unescape(text, replacement):
+    for character, html_escape_code in escaped_characters.items():
+        bsvp_escape_code = character + "&SM"
+        other_bsvp_escape_code = html_escape_code.replace(";", "&SM")
+        text = text.replace(bsvp_escape_code, replacement(character, html_escape_code))
+        text = text.replace(other_bsvp_escape_code, replacement(character, html_escape_code))
+    text = text.replace("color&SEM", "color:")
+    text = text.replace("&EOL", "")
+    text = text.replace("&SM", "")
+    return text
+
+def previous_unescape_bsvp_to_html(text):
+    return previous_unescape(text, lambda character, html_escape_code: html_escape_code)
+
+def previous_unescape_bsvp_to_text(text):
+    return previous_unescape(text, lambda character, html_escape_code: character)
+
+def previous_html_escape(text):
+    text = html.escape(text)
+    for character, escape_code in escaped_characters.items():
+        text = text.replace(character, escape_code)
+    return text
+
+# Bruchstücke, aus denen die Texte zusammengesetzt werden. Neben den
+# vollständigen Escape-Codes auch deren Teile, damit Codes erst durch das
+# Entfernen von &EOL oder &SM entstehen können.
+fragments = [
+    "E", "O", "L", "#", "&SEM", "&E", "SE", "color", "col", "or", "EOL", "&EO",
+    "<", ">", "\"", "'", "&amp;", "&lt;", "x", " ", "\n", "∆", "✓", "uml"
+]
+# Werden häufiger gewählt, da die Sonderfälle erst aus mehreren davon
+# entstehen
+marker_fragments = ["&", "&EOL", "&SM", "S", "M", "SM", "&S", "EM", ";"]
+for character, escape_code in escaped_characters.items():
+    fragments += [
+        character,
+        escape_code,
+        escape_code.replace(";", "&SM"),
+        escape_code[:-1],
+        character + "&SM"
+    ]
+
+def generated_texts(seed, count, max_fragments=12):
+    generator = random.Random(seed)
+    for index in range(count):
+        yield "".join(
+            generator.choice(marker_fragments if generator.random() < 0.5 else fragments)
+            for fragment_index in range(generator.randint(0, max_fragments))
+        )
+
+class UnescapeBsvpTest(unittest.TestCase):
+    def test_to_html_matches_previous_implementation(self):
+        for text in generated_texts(1, 20000):
+            self.assertEqual(unescape_bsvp_to_html(text), previous_unescape_bsvp_to_html(text), repr(text))
+
+    def test_to_text_matches_previous_implementation(self):
+        for text in generated_texts(2, 20000):
+            self.assertEqual(unescape_bsvp_to_text(text), previous_unescape_bsvp_to_text(text), repr(text))
+
+    def test_codes_formed_by_removed_markers(self):
+        # &EOL und &SM werden wie bisher nacheinander entfernt
+        for text in ["&&EOLSM", "&S&EOLM", "ä&S&EOLM", "&auml&S&EOLM", "color&S&EOLEM", "&&EOLS&EOLM"]:
+            self.assertEqual(unescape_bsvp_to_html(text), previous_unescape_bsvp_to_html(text), repr(text))
+            self.assertEqual(unescape_bsvp_to_text(text), previous_unescape_bsvp_to_text(text), repr(text))
+
+class HtmlEscapeTest(unittest.TestCase):
+    def test_matches_previous_implementation(self):
+        for text in generated_texts(3, 20000):
+            self.assertEqual(html_escape(text), previous_html_escape(text), repr(text))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+from modules.parser.prod import parse_product
+from modules.exporter.utils.field_view import FieldView
+
+# Bisherige Umsetzung, FieldView muss dieselben Felder in derselben
+# Reihenfolge liefern
+
+def flatten_fields(fields):
+    flattened_fields = {}
+    for field_name, field_value in fields.items():
+        if isinstance(field_value, str):
+            flattened_fields[field_name] = field_value
+        else:
+            for attribute_name, attribute_value in field_value.items():
+                flattened_fields[attribute_name] = attribute_value
+    return flattened_fields
+
+class FieldViewTest(unittest.TestCase):
+    def assert_same_lookups(self, fields, probe_names=()):
+        flattened_fields = flatten_fields(fields)
+        view = FieldView(fields)
+        names = set(flattened_fields) | set(fields) | set(probe_names) | {"FEHLT"}
+        for name in names:
+            self.assertEqual(name in view, name in flattened_fields, name)
+            self.assertEqual(view.get(name), flattened_fields.get(name), name)
+            self.assertEqual(view.get(name, "-"), flattened_fields.get(name, "-"), name)
+            if name in flattened_fields:
+                self.assertEqual(view[name], flattened_fields[name], name)
+            else:
+                with self.assertRaises(KeyError):
+                    view[name]
+        self.assertEqual(list(view), list(flattened_fields))
+        self.assertEqual(len(view), len(flattened_fields))
+        self.assertEqual(dict(view.items()), flattened_fields)
+
+    def test_attributes_shadow_earlier_fields(self):
+        self.assert_same_lookups(OrderedDict([
+            ("0000139", "Feld"),
+            ("ARTNR", "A-1"),
+            ("TECHDATA", {"0000139": "R290", "0000191": "Kühlschrank"})
+        ]))
+
+    def test_later_fields_shadow_attributes(self):
+        self.assert_same_lookups(OrderedDict([
+            ("TECHDATA", {"0000139": "R290", "ARTNR": "aus TECHDATA"}),
+            ("ARTNR", "A-1")
+        ]))
+
+    def test_section_names_are_not_fields(self):
+        # Felder mit Attributen erscheinen nur über ihre Attribute, auch
+        # leere oder mit Punkt im Namen
+        self.assert_same_lookups(OrderedDict([
+            ("ARTNR", "A-1"),
+            ("TECHDATA", {"0000191": "Kühlschrank"}),
+            ("DOWNLOAD.1", {"0000058": "x.pdf"}),
+            ("PIC.1", "b.jpg"),
+            ("EMPTY", {})
+        ]), ["TECHDATA", "DOWNLOAD.1", "EMPTY"])
+
+    def test_duplicate_attributes_in_several_sections(self):
+        # Das Attribut des letzten Abschnitts gilt, auch mit einem
+        # gleichnamigen Feld dazwischen
+        self.assert_same_lookups(OrderedDict([
+            ("TECHDATA", {"0000139": "R290", "0000191": "Kühlschrank"}),
+            ("0000139", "Feld"),
+            ("OTHER", {"0000139": "R600a", "X": "1"}),
+            ("X", "Feld X")
+        ]))
+
+    def test_missing_fields(self):
+        view = FieldView({"ARTNR": "A-1", "TECHDATA": {"0000191": "Kühlschrank"}})
+        self.assertFalse("FEHLT" in view)
+        self.assertEqual(view.get("FEHLT"), None)
+        self.assertEqual(view.get("FEHLT", ""), "")
+        with self.assertRaises(KeyError):
+            view["FEHLT"]
+        self.assert_same_lookups({})
+        self.assert_same_lookups({"ARTNR": "A-1"})
+
+    def test_generated_field_layouts(self):
+        generator = random.Random(4)
+        names = ["ARTNR", "NAME", "DESC", "0000139", "0000191", "0000058", "TECHDATA", "OTHER", "PIC.1"]
+        for index in range(3000):
+            fields = OrderedDict()
+            for field_index in range(generator.randint(0, 8)):
+                name = generator.choice(names)
+                if generator.random() < 0.3:
+                    fields[name] = {
+                        generator.choice(names): str(attribute_index)
+                        for attribute_index in range(generator.randint(0, 4))
+                    }
+                else:
+                    fields[name] = "Wert {}".format(field_index)
+            self.assert_same_lookups(fields, names)
+
+    def test_parsed_product(self):
+        product_data = "§+§".join([
+            "EAN=4000",
+            "0000139=Feld vor TECHDATA",
+            "MANUFACTURER=Cool &amp; Co",
+            "ARTNR=COO-000",
+            "PIC.1=b.jpg",
+            "TECHDATA=" + "§-§".join([
+                "A::Kältemittel::R290@[[x.0000139]]",
+                "A::Produkttyp::Kühlschrank@[[x.0000191]]",
+                "A::Leer::@[[x.0000058]]"
+            ]),
+            "DOWNLOAD.1=" + "§-§".join([
+                "A::Datenblatt::x.pdf@[[x.0000058]]",
+                "A::Produkttyp::Tisch@[[x.0000191]]"
+            ]),
+            "DELSTAT=1"
+        ])
+        directory = tempfile.mkdtemp()
+        try:
+            product_path = os.path.join(directory, "COO-000.prod")
+            with open(product_path, "w", encoding="utf-8") as product_file:
+                product_file.write(product_data)
+            fields, attribute_names, attribute_types, error_code = parse_product(product_path)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(error_code, None)
+        self.assert_same_lookups(fields, ["TECHDATA", "DOWNLOAD.1"])
+        self.assertEqual(FieldView(fields)["0000191"], "Tisch")
+        self.assertEqual(FieldView(fields)["0000139"], "R290")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from modules.logger import Logger, WARN
+from modules.formatter import format_field, format_column, format_cache
+
+class CountingFormat():
+    # Formatierung, die ihre Aufrufe zählt und einen Log schreibt
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, value):
+        self.calls.append(value)
+        Logger().log("formatiert {}", value, level=WARN)
+        return value.upper()
+
+class FormatColumnTest(unittest.TestCase):
+    def setUp(self):
+        format_cache.clear()
+        format_cache.reset_stats()
+
+    def test_column_uses_format_cache(self):
+        format_option = CountingFormat()
+        options = {"NAME": format_option}
+        column = format_column(["a", "b", "a", "a", "c"], "NAME", options)
+        self.assertEqual([result for result, log_lines in column], ["A", "B", "A", "A", "C"])
+        self.assertEqual(column[2][1], (("formatiert {}", ("a",), WARN),))
+        # Eine Abfrage pro unterschiedlichem Wert
+        self.assertEqual(format_option.calls, ["a", "b", "c"])
+        self.assertEqual((format_cache.hits, format_cache.misses), (0, 3))
+
+        # Spalten und einzelne Felder teilen sich die Ergebnisse
+        format_column(["b", "d"], "NAME", options)
+        logger = Logger()
+        with logger.captured() as log_lines:
+            self.assertEqual(format_field("c", "NAME", options), "C")
+        self.assertEqual(log_lines, [("formatiert {}", ("c",), WARN)])
+        self.assertEqual(format_option.calls, ["a", "b", "c", "d"])
+        self.assertEqual((format_cache.hits, format_cache.misses), (2, 4))
+
+    def test_field_without_formatting(self):
+        column = format_column(["a", None], "OHNE", {"NAME": CountingFormat()})
+        self.assertEqual(column, [("a", ()), (None, ())])
+        self.assertEqual((format_cache.hits, format_cache.misses), (0, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from modules.logger import Logger, DEBUG, INFO, WARN
+
+class CountingValue():
+    # Zählt, wie oft der Wert für einen Log-Text formatiert wird
+    def __init__(self, text):
+        self.text = text
+        self.formatted = 0
+
+    def __format__(self, format_spec):
+        self.formatted += 1
+        return self.text
+
+class CapturedLogTest(unittest.TestCase):
+    def setUp(self):
+        self.logger = Logger()
+        self.level = self.logger.level
+        self.logger.set_level(INFO)
+        self.written = []
+        self.write = self.logger.writer.write
+        self.logger.writer.write = self.written.append
+
+    def tearDown(self):
+        self.logger.writer.write = self.write
+        self.logger.set_level(self.level)
+
+    def test_captured_lines_are_formatted_on_replay(self):
+        value = CountingValue("Wert")
+        with self.logger.captured() as log_lines:
+            self.logger.log("Formatiert: {}", value, level=WARN)
+            self.logger.log("Nur für DEBUG: {}", value, level=DEBUG)
+        self.assertEqual(value.formatted, 0)
+        self.assertEqual(log_lines, [
+            ("Formatiert: {}", (value,), WARN),
+            ("Nur für DEBUG: {}", (value,), DEBUG)
+        ])
+        self.logger.replay(log_lines)
+        self.assertEqual(self.written, ["Formatiert: Wert"])
+        self.assertEqual(value.formatted, 1)
+
+    def test_replay_at_another_level(self):
+        # Gesammelte Logs (z.B. im Cache der Formatierungen) werden mit dem
+        # Level beim Schreiben gefiltert
+        with self.logger.captured() as log_lines:
+            self.logger.log("Details {}", 1, level=DEBUG)
+        self.logger.replay(log_lines)
+        self.assertEqual(self.written, [])
+        self.logger.set_level(DEBUG)
+        self.logger.replay(log_lines)
+        self.assertEqual(self.written, ["Details 1"])
+
+    def test_replay_into_outer_capture(self):
+        value = CountingValue("innen")
+        with self.logger.captured() as outer_lines:
+            with self.logger.captured() as inner_lines:
+                self.logger.log("{}", value, level=WARN)
+            self.logger.replay(inner_lines)
+        self.assertEqual(outer_lines, [("{}", (value,), WARN)])
+        self.assertEqual(value.formatted, 0)
+
+    def test_text_without_arguments_is_not_formatted(self):
+        with self.logger.captured() as log_lines:
+            self.logger.log("{\"json\": true}", level=WARN)
+        self.logger.replay(log_lines)
+        self.assertEqual(self.written, ["{\"json\": true}"])
+
+    def test_is_enabled_follows_level_while_capturing(self):
+        with self.logger.captured():
+            self.assertFalse(self.logger.is_enabled(DEBUG))
+            self.assertTrue(self.logger.is_enabled(WARN))
+        with self.logger.muted():
+            with self.logger.captured():
+                self.assertFalse(self.logger.is_enabled(WARN))
+
+if __name__ == "__main__":
+    unittest.main()
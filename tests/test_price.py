@@ -0,0 +1,141 @@
+import math
+import random
+import unittest
+from modules.logger import Logger, WARN
+from modules.exporter.shop.price import export_price, export_min_price
+
+# Bisherige Umsetzung, die ILUGG Felder werden für jedes Produkt zerlegt.
+# Preise, Fehler und Logs müssen gleich bleiben.
+
+def previous_get_number(string):
+    if ("," in string):
+        if ("." in string):
+            string = string.replace(",", "")
+        else:
+            string = string.replace(",", ".")
+    return float(string)
+
+def previous_get_factor(prod_fields, prod_field, ilugg_fields, ilugg_field):
+    prod_definition = prod_fields[prod_field]
+    ilugg_definition = ilugg_fields[ilugg_field]
+    factor_category = prod_definition.split(":")[0]
+    factor = None
+    for factor_definition in ilugg_definition.split("§"):
+        if factor_definition.startswith("{}:".format(factor_category)):
+            factor = factor_definition.split(":")[1]
+            break
+    if factor == None:
+        factor = prod_definition
+        if ":" in factor:
+            factor = factor.split(":")[1]
+        log_text = "{}: Faktor zur Preisberechnung".format(prod_fields["ARTNR"])
+        log_text += " konnte nicht bestimmt werden."
+        log_text += " {} in PROD ist '{}',".format(prod_field, prod_definition)
+        log_text += " {} in ILUGG ist '{}'.".format(ilugg_field, ilugg_definition)
+        log_text += " {} wird als Faktor angenommen.".format(factor)
+        Logger().log(log_text, level=WARN)
+    return previous_get_number(factor)
+
+def previous_purchasing_price(prod_fields, ilugg_fields):
+    catalog_price = previous_get_number(prod_fields["PRICE"])
+    return catalog_price * previous_get_factor(prod_fields, "RABATT", ilugg_fields, "RABATT")
+
+def previous_export_price(prod_fields, ilugg_fields):
+    price_base = prod_fields["PRICEBASE"]
+    user_factor = previous_get_factor(prod_fields, "USERFAKTVK", ilugg_fields, "UFAKTVK")
+    if price_base == "NettoPrice":
+        base_price = previous_purchasing_price(prod_fields, ilugg_fields)
+    elif price_base == "ListPrice":
+        base_price = previous_get_number(prod_fields["PRICE"])
+    else:
+        raise Exception("{}: Unerwartete PRICEBASE '{}'".format(prod_fields["ARTNR"], price_base))
+    return str(math.floor(base_price * user_factor))
+
+def previous_export_min_price(prod_fields, ilugg_fields):
+    purchasing_price = previous_purchasing_price(prod_fields, ilugg_fields)
+    factor_definition = ilugg_fields["MinPriceFormular"]
+    factor_definition_parts = factor_definition.replace("IF ($EK<", "")
+    factor_definition_parts = factor_definition_parts.replace(") THEN ($EK*", " ")
+    factor_definition_parts = factor_definition_parts.replace(") ELSE ($EK*", " ")
+    factor_definition_parts = factor_definition_parts.replace(")", "")
+    values = factor_definition_parts.split(" ")
+    threshold = previous_get_number(values[0])
+    greater_factor = previous_get_number(values[1])
+    smaller_factor = previous_get_number(values[2])
+    if purchasing_price < threshold:
+        min_price_factor = greater_factor
+    else:
+        min_price_factor = smaller_factor
+    return str(math.floor(purchasing_price * min_price_factor))
+
+categories = ["A", "B", "AB", ""]
+numbers = ["1", "0,8", "0.75", "1,25", "2", "1.234,5", "1,000.5", "0", "x", ""]
+
+def generated_manufacturers(seed, count):
+    # Pro Hersteller eine ILUGG Datei und mehrere Produkte, damit die
+    # Preistabellen wiederverwendet werden
+    generator = random.Random(seed)
+    def factor_definitions():
+        definitions = [
+            generator.choice(categories) + ":" + generator.choice(numbers)
+            for index in range(generator.randint(0, 4))
+        ]
+        # Doppelte Kategorien, Einträge ohne Faktor oder mit weiteren Teilen
+        definitions += generator.sample(["A", "A:", "B:1:2", "C:3", "A:0,5"], generator.randint(0, 2))
+        generator.shuffle(definitions)
+        return "§".join(definitions)
+    def prod_definition():
+        definition = generator.choice(categories + ["C", "D"])
+        if generator.random() < 0.7:
+            definition += ":" + generator.choice(numbers)
+        return definition
+    for index in range(count):
+        ilugg_fields = {
+            "RABATT": factor_definitions(),
+            "UFAKTVK": factor_definitions(),
+            "MinPriceFormular": "IF ($EK<{}) THEN ($EK*{}) ELSE ($EK*{})".format(
+                generator.choice(["100", "250,5", "1.000,5", "x"]),
+                generator.choice(["1,5", "2", "1.1"]),
+                generator.choice(["1,2", "1", "y"])
+            )
+        }
+        products = []
+        for product_index in range(generator.randint(1, 6)):
+            products.append({
+                "ARTNR": "A-{}-{}".format(index, product_index),
+                "PRICE": generator.choice(["99,99", "1.234,56", "250", "0,5", "12.5", "x"]),
+                "RABATT": prod_definition(),
+                "USERFAKTVK": prod_definition(),
+                "PRICEBASE": generator.choice(["NettoPrice", "NettoPrice", "ListPrice", "Brutto"])
+            })
+        yield ilugg_fields, products
+
+def outcome(export, *arguments):
+    # Ergebnis oder Fehler und die geschriebenen Logs
+    logger = Logger()
+    with logger.captured() as log_lines:
+        try:
+            result = ("ergebnis", export(*arguments))
+        except Exception as exception:
+            result = ("fehler", type(exception), str(exception))
+    return result, log_lines
+
+class PriceTest(unittest.TestCase):
+    def test_matches_previous_implementation(self):
+        for ilugg_fields, products in generated_manufacturers(5, 5000):
+            for prod_fields in products:
+                for export, previous_export in [
+                    (export_price, previous_export_price),
+                    (export_min_price, previous_export_min_price)
+                ]:
+                    # Ohne gemeinsame Zwischenergebnisse, damit jeder Preis
+                    # seine Logs wie bisher schreibt
+                    parameters = { "prod_fields": prod_fields, "ilugg_fields": ilugg_fields, "memo": {} }
+                    self.assertEqual(
+                        outcome(export, parameters),
+                        outcome(previous_export, prod_fields, ilugg_fields),
+                        (prod_fields, ilugg_fields)
+                    )
+
+if __name__ == "__main__":
+    unittest.main()